@@ -4,17 +4,21 @@ import numpy as np
 from datetime import timedelta
 
 # --- IMPORT LENGKAP ---
-from utils.data_loader import (
-    load_dataset, 
-    load_prediction_model, 
-    prepare_input_data, 
-    load_shap_data, 
+from utils.st_adapter import (
+    load_dataset_index,
+    load_shap_cube, 
     load_evaluation_files, 
-    EMITENS, 
-    IDX_QUANT, 
-    IDX_QUAL
+    EMITENS
 )
-from utils.plots import plot_advanced_technical, plot_interactive_forecast, plot_interactive_shap
+from utils.model_loader import get_model_registry
+from utils.pipeline import ForecastJob, STAGES
+from utils.forecast import HORIZON
+from utils.recursive import predict_paths
+from utils.explain import explain_window
+from utils.uncertainty import forecast_bands, UNCERTAINTY_SAMPLES
+from utils.plots import technical_figure, plot_interactive_forecast, plot_interactive_shap
+from utils.metrics import timer
+from utils.diagnostics import render_diagnostics
 
 # 1. PAGE CONFIG
 st.set_page_config(
@@ -28,6 +32,11 @@ st.set_page_config(
 with open('style.css') as f:
     st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
+# Halaman diagnostik tersembunyi (tidak ada di sidebar): buka /?diagnostics=1
+if st.query_params.get('diagnostics') == '1':
+    render_diagnostics()
+    st.stop()
+
 # 3. HEADER & SELECTOR (DIGABUNG BIAR VAR 'selected_emiten' AMAN)
 c1, c2 = st.columns([3, 1])
 
@@ -50,12 +59,14 @@ st.divider()
 
 # 4. LOAD DATA UTAMA
 with st.spinner("Connecting to Market Data Engine..."):
-    df = load_dataset()
+    index = load_dataset_index()
+    # Registry model dishare antar sesi; di mode 'eager' semua model di-warm di sini
+    get_model_registry()
 
 # 5. MAIN LOGIC (Sekarang aman karena 'selected_emiten' sudah ada)
-if not df.empty and selected_emiten in df['relevant_issuer'].values:
-    # Filter Data Emiten & Sort
-    df_e = df[df['relevant_issuer'] == selected_emiten].sort_values('date')
+if selected_emiten in index:
+    # Data Emiten dari index per emiten (sudah terurut, tanpa filter ulang)
+    df_e = index.get_emiten(selected_emiten)
     
     # Ambil Data Terakhir untuk KPI
     last_row = df_e.iloc[-1]
@@ -109,35 +120,25 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
                 date_range = st.date_input("Timeframe Range", value=(default_start, max_date), min_value=min_date, max_value=max_date)
 
             with c_tools2:
-                # Indicator Multiselect (Lebih rapi daripada banyak checkbox)
-                available_inds = ["Moving Average (20)", "Volume", "MACD", "RSI"]
-                default_inds = ["Volume"] # Default bersih, cuma harga & volume
-                
-                selected_inds = st.multiselect(
-                    "Active Indicators", 
-                    available_inds, 
-                    default=default_inds,
-                    placeholder="Add technical indicators..."
-                )
+                # Indikator di-toggle dari menu di dalam chart (client-side, tanpa rerun)
+                st.caption("Indicators: use the **menu at the top-right of the chart** to switch Volume / MACD / RSI panels and the MA (20) overlay — no page reload.")
 
         # --- CHART RENDERING ---
         # 1. Filter Data by Date
         if isinstance(date_range, tuple) and len(date_range) == 2:
             start_d, end_d = date_range
-            mask = (df_e['date'].dt.date >= start_d) & (df_e['date'].dt.date <= end_d)
-            df_plot = df_e.loc[mask]
+            df_plot = index.get_range(selected_emiten, start_d, end_d)
         else:
             df_plot = df_e 
 
-        # 2. Parse Selected Indicators
-        show_ma = "Moving Average (20)" in selected_inds
-        show_vol = "Volume" in selected_inds
-        show_macd = "MACD" in selected_inds
-        show_rsi = "RSI" in selected_inds
-
-        # 3. Plot Chart
-        fig_tech = plot_advanced_technical(df_plot, selected_emiten, show_ma, show_vol, show_macd, show_rsi)
-        st.plotly_chart(fig_tech, use_container_width=True)
+        # 2. Plot Chart
+        # Figure (semua panel + menu toggle) di-cache per (emiten, timeframe); ganti indikator
+        # dijalankan Plotly.js di browser, jadi tidak ada rerun maupun payload baru
+        fig_tech = technical_figure(df_plot, selected_emiten)
+        # Serialisasi Plotly -> browser terjadi di dalam st.plotly_chart; key tetap per emiten
+        # supaya frontend meng-update chart yang sama (Plotly.react) alih-alih mount ulang
+        with timer('plot.render'):
+            st.plotly_chart(fig_tech, use_container_width=True, key=f"tech_chart_{selected_emiten}")
         
         # --- DATA GRID (Footer) ---
         st.markdown("### 📋 Historical Data Log")
@@ -178,7 +179,7 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
                     </div>
                     <div style="border-right: 1px solid #e5e7eb;">
                         <p style="margin: 0; color: #6b7280; font-size: 12px; font-weight: 600; text-transform: uppercase;">Forecast Horizon</p>
-                        <p style="margin: 5px 0 0 0; color: #111827; font-size: 18px; font-weight: 700;">T+3 Days</p>
+                        <p style="margin: 5px 0 0 0; color: #111827; font-size: 18px; font-weight: 700;">T+""" + str(st.session_state.get('forecast_horizon', HORIZON)) + """ Days</p>
                         <p style="margin: 0; color: #6366f1; font-size: 11px;">● Short-term</p>
                     </div>
                     <div style="border-right: 1px solid #e5e7eb;">
@@ -200,7 +201,10 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
         # Menggunakan kolom agar tombol tidak terlalu lebar di layar ultra-wide
         c_btn1, c_btn2, c_btn3 = st.columns([1, 2, 1])
         with c_btn2:
+            # > 3 hari: H+1..H+3 langsung dari model, sisanya rekursif (prediksi diumpankan kembali)
+            forecast_horizon = st.select_slider("Forecast Horizon (days)", options=[3, 5, 10, 20, 30], value=HORIZON, key='forecast_horizon')
             run_pred = st.button("⚡ GENERATE AI FORECAST", type="primary", use_container_width=True)
+            show_bands = st.toggle(f"Show uncertainty bands ({UNCERTAINTY_SAMPLES} samples)", value=False)
 
         # --- 2. EXECUTION LOGIC ---
         if run_pred:
@@ -212,40 +216,32 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
                 # A. PREPARE DATA
                 my_bar.progress(10, text="Preprocessing Market Data...")
                 window_size = 60
-                raw_data = prepare_input_data(df_e, window_size)
+                raw_data = index.get_window(selected_emiten, n=window_size)
                 
                 if raw_data is not None:
-                    # B. LOAD MODELS
-                    my_bar.progress(30, text=f"Loading Baseline & Fusion Models for {selected_emiten}...")
-                    model_base, scaler = load_prediction_model(selected_emiten, 'baseline')
-                    model_fuse, _       = load_prediction_model(selected_emiten, 'fusion')
+                    # B. FORECAST: baseline & fusion jalan paralel, progress mengikuti event tiap tahap
+                    job = ForecastJob(selected_emiten, ['baseline', 'fusion'], window_size, index)
+                    done = 0
+                    errors = {}  # scenario -> detail exception dari pipeline
+                    for event in job.events():
+                        if event.stage == 'error': errors[event.scenario] = event.detail
+                        if event.stage in ('done', 'error'): continue
+                        # Cache hit melompati sisa tahap skenario tersebut
+                        done += len(STAGES) - 1 if event.stage == 'cache' else 1
+                        label = "Cache Hit" if event.stage == 'cache' else event.stage.title()
+                        my_bar.progress(min(done / job.total_stages, 1.0),
+                                        text=f"{event.scenario.title()} · {label} ({event.ms:.0f} ms)")
+                    results = job.result()
+                    price_base, price_fuse = results['baseline'], results['fusion']
+                    if forecast_horizon > HORIZON and price_base is not None and price_fuse is not None:
+                        my_bar.progress(0.95, text=f"Recursive Forecast (T+{forecast_horizon})...")
+                        paths = predict_paths(selected_emiten, ['baseline', 'fusion'], forecast_horizon, window_size, index)
+                        price_base, price_fuse = paths['baseline'], paths['fusion']
                     
-                    if model_base and model_fuse:
-                        # C. SCALING & PREDICT
-                        my_bar.progress(60, text="Running Inference Engine...")
-                        data_scaled = scaler.transform(raw_data) 
-                        
-                        X_base = data_scaled[:, IDX_QUANT].reshape(1, window_size, len(IDX_QUANT))
-                        pred_base_sc = model_base.predict(X_base, verbose=0)[0]
-                        
-                        X_fuse_quant = data_scaled[:, IDX_QUANT].reshape(1, window_size, len(IDX_QUANT))
-                        X_fuse_qual  = data_scaled[:, IDX_QUAL].reshape(1, window_size, len(IDX_QUAL))
-                        pred_fuse_sc = model_fuse.predict([X_fuse_quant, X_fuse_qual], verbose=0)[0]
-                        
-                        # D. INVERSE SCALING
-                        my_bar.progress(80, text="Denormalizing Output...")
-                        def inverse_price(pred_array, scaler):
-                            dummy = np.zeros((len(pred_array), len(IDX_QUANT) + len(IDX_QUAL)))
-                            dummy[:, 0] = pred_array 
-                            inv = scaler.inverse_transform(dummy)
-                            return inv[:, 0]
-                        
-                        price_base = inverse_price(pred_base_sc, scaler)
-                        price_fuse = inverse_price(pred_fuse_sc, scaler)
-                        
-                        # E. GENERATE DATES
+                    if price_base is not None and price_fuse is not None:
+                        # C. GENERATE DATES
                         last_date = df_e['date'].max()
-                        dates_fut = pd.date_range(last_date + timedelta(days=1), periods=3)
+                        dates_fut = pd.date_range(last_date + timedelta(days=1), periods=len(price_fuse))
                         
                         # Selesai Loading
                         my_bar.progress(100, text="Completed.")
@@ -285,10 +281,12 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
                         # B. FAN CHART
                         st.markdown("###")
                         st.markdown("**📉 Trajectory Visualization**")
-                        fig_pred = plot_interactive_forecast(df_e, price_base, price_fuse, dates_fut, selected_emiten)
+                        bands = forecast_bands(selected_emiten, 'fusion', index=index) if show_bands else None
+                        fig_pred = plot_interactive_forecast(df_e, price_base, price_fuse, dates_fut, selected_emiten, bands)
                         # Tweak chart height/margin for dashboard feel
                         fig_pred.update_layout(margin=dict(t=10, b=10, l=10, r=10), height=450)
-                        st.plotly_chart(fig_pred, use_container_width=True)
+                        with timer('plot.render'):
+                            st.plotly_chart(fig_pred, use_container_width=True)
                         
                         # C. DETAILED TABLE (Clean Look)
                         with st.expander("🔎 View Detailed Projection Table", expanded=True):
@@ -312,6 +310,10 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
                                 }
                             )
                         
+                    elif errors:
+                        my_bar.empty()
+                        for scenario, detail in errors.items():
+                            st.error(f"⚠️ Forecast {scenario.title()} gagal: {detail}")
                     else:
                         st.error("⚠️ Model Error: File .h5 tidak ditemukan atau rusak.")
                 else:
@@ -438,9 +440,9 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
     # =========================================
     with tab_xai:
         st.markdown("### 🧠 Market Drivers Analysis (SHAP)")
-        df_shap = load_shap_data()
+        shap_cube = load_shap_cube()
         
-        if not df_shap.empty:
+        if shap_cube.scenarios:
             # --- 1. CONFIGURATION & INSIGHT PANEL ---
             c_config, c_insight = st.columns([1, 2])
             
@@ -451,12 +453,17 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
                 """, unsafe_allow_html=True)
                 
                 view_mode = st.radio("Perspective:", ["Global (All Assets)", "Single Asset Focus"], label_visibility="collapsed")
+                # Baseline & fusion punya set fitur berbeda, jangan dirata-rata bersama
+                idx_scn = shap_cube.scenarios.index('fusion') if 'fusion' in shap_cube.scenarios else 0
+                shap_scenario = st.selectbox("Model Scenario:", shap_cube.scenarios, index=idx_scn, format_func=str.capitalize)
                 
                 if view_mode == "Single Asset Focus":
                     st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True) # Spacer
                     # Auto-select emiten yang sedang aktif di header
                     idx_curr = EMITENS.index(selected_emiten) if selected_emiten in EMITENS else 0
                     shap_emiten = st.selectbox("Select Ticker:", EMITENS, index=idx_curr)
+                    # Atribusi dihitung dari window 60 hari terakhir (input forecast saat ini)
+                    live_shap = st.toggle("Live explanation (current window)", value=False)
                 
                 st.markdown("</div>", unsafe_allow_html=True)
                 
@@ -477,20 +484,32 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
 
             with c_insight:
                 # DATA PREPARATION FOR VISUALIZATION
+                # Lookup langsung ke cube SHAP (agregat & ranking sudah dihitung saat load)
                 if view_mode == "Global (All Assets)":
-                    df_viz = df_shap.groupby(['Feature', 'Feature Name', 'Category'])['Importance'].mean().reset_index()
+                    shap_subject = None
                     chart_title = "Global Market Drivers (Avg. Impact)"
                     subject = "Market (LQ45)"
                 else:
-                    df_viz = df_shap[df_shap['Emiten'] == shap_emiten].copy()
+                    shap_subject = shap_emiten
                     chart_title = f"Top Drivers for {shap_emiten}"
                     subject = shap_emiten
+                df_viz = shap_cube.view(shap_scenario, shap_subject)
+                shap_x_title = "Mean |SHAP Value| (Impact Magnitude)"
+
+                if view_mode != "Global (All Assets)" and live_shap:
+                    df_live = explain_window(shap_emiten, shap_scenario)
+                    if df_live is not None:
+                        df_viz = df_live
+                        chart_title = f"Live Drivers for {shap_emiten} (Latest Window)"
+                        shap_x_title = "|Shapley Value| (Avg. H+1..H+3, Scaled Price)"
+                    else:
+                        st.warning(f"Live explanation unavailable for {shap_emiten}; showing offline summary.")
 
                 # --- INTELLIGENT INSIGHT GENERATION ---
-                # Hitung Top 3 Drivers
-                df_sorted = df_viz.sort_values('Importance', ascending=False)
-                top_3_names = df_sorted.head(3)['Feature Name'].tolist()
-                top_3_cats = df_sorted.head(3)['Category'].tolist()
+                # Top 3 Drivers
+                df_top = df_viz.head(3)
+                top_3_names = df_top['Feature Name'].tolist()
+                top_3_cats = df_top['Category'].tolist()
                 
                 # Logic Warna & Pesan
                 if 'Sentiment' in top_3_cats:
@@ -524,7 +543,7 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
 
             # --- 2. MAIN VISUALIZATION ---
             st.markdown("###") # Spacer
-            fig_shap = plot_interactive_shap(df_viz, chart_title)
+            fig_shap = plot_interactive_shap(df_viz, chart_title, shap_x_title)
             # Sedikit styling layout chart agar pas dengan card di atas
             fig_shap.update_layout(margin=dict(t=30, l=0, r=0, b=0), height=450)
             st.plotly_chart(fig_shap, use_container_width=True)
@@ -532,7 +551,7 @@ if not df.empty and selected_emiten in df['relevant_issuer'].values:
             # --- 3. RAW DATA (Optional but Pro) ---
             with st.expander("🔎 Audit Raw SHAP Values"):
                 st.dataframe(
-                    df_viz.sort_values('Importance', ascending=False)[['Feature Name', 'Category', 'Importance']], 
+                    df_viz[['Feature Name', 'Category', 'Importance']], 
                     use_container_width=True,
                     hide_index=True,
                     column_config={
@@ -0,0 +1,44 @@
+"""
+Memori privat per proses saat N proses memuat dataset index dan membaca semua window:
+feature store mmap bersama vs matriks fitur privat (FEATURE_STORE=off).
+Membaca Private_* dari /proc/self/smaps_rollup (Linux).
+
+Jalankan dari root repo: python -m benchmarks.bench_feature_store [--procs 4]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROBE = """
+import numpy as np
+from utils.data_loader import load_dataset_index
+index = load_dataset_index()
+total = sum(float(index.get_window(t, n=len(index.get_block(t))).sum()) for t in index.tickers())
+kb = {}
+with open('/proc/self/smaps_rollup') as f:
+    for line in f:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1].isdigit(): kb[parts[0].rstrip(':')] = int(parts[1])
+print(kb.get('Private_Clean', 0) + kb.get('Private_Dirty', 0), kb.get('Shared_Clean', 0), kb.get('Pss', 0))
+"""
+
+def run(mode, procs):
+    env = dict(os.environ, FEATURE_STORE=mode)
+    children = [subprocess.Popen([sys.executable, '-c', PROBE], env=env, stdout=subprocess.PIPE, text=True)
+                for _ in range(procs)]
+    rows = [list(map(int, c.communicate()[0].split())) for c in children]
+    private, shared, pss = (sum(col) / len(rows) / 1024 for col in zip(*rows))
+    print(f"{mode:<6} {procs} proses | private {private:7.1f} MB | shared {shared:7.1f} MB | PSS {pss:7.1f} MB per proses")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--procs', type=int, default=4)
+    args = parser.parse_args()
+    # Pastikan cache Feather & feature store sudah ada sebelum proses paralel dimulai
+    subprocess.run([sys.executable, '-m', 'utils.feature_store'], check=True)
+    for mode in ('off', 'mmap'):
+        run(mode, args.procs)
+
+if __name__ == '__main__':
+    main()
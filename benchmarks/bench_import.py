@@ -0,0 +1,41 @@
+"""
+Benchmark cold start per halaman: waktu render pertama (AppTest, proses baru)
+dan apakah TensorFlow ikut ter-import.
+
+Jalankan dari root repo: python -m benchmarks.bench_import
+"""
+import glob
+import json
+import os
+import subprocess
+import sys
+
+PAGES = ['Home.py'] + sorted(glob.glob('pages/*.py'))
+
+# Dijalankan di subprocess agar setiap halaman benar-benar cold (sys.modules kosong)
+PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+print(json.dumps({
+    'ms': (time.perf_counter() - t0) * 1000,
+    'tensorflow': 'tensorflow' in sys.modules,
+    'errors': len(at.exception),
+}))
+"""
+
+def probe(page):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE, os.path.abspath(page)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    for page in PAGES:
+        r = probe(page)
+        print(f"{os.path.basename(page):<40} {r['ms']:9.1f} ms  tf={r['tensorflow']!s:<5}  exc={r['errors']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Load test forecast service: server in-process, banyak client thread paralel
+memanggil POST /forecast/window (jalur micro-batcher) dan GET /forecast/<EMITEN>.
+
+Jalankan dari root repo: python -m benchmarks.bench_service [--clients 32] [--requests 2000]
+Exit code 1 jika ada error koneksi (reset/refused) atau status selain 200.
+"""
+import argparse
+import json
+import threading
+import time
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.data_loader import load_dataset_index, EMITENS
+from utils.service import ForecastService, make_server
+
+def client_loop(port, n, make_request, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    for i in range(n):
+        method, path, body = make_request(i)
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            resp = conn.getresponse()
+            resp.read()
+        except (OSError, http.client.HTTPException) as e:
+            # Koneksi direset/ditolak: catat lalu buka koneksi baru
+            errors.append(f"{type(e).__name__}: {e}")
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            continue
+        if resp.status != 200: errors.append(f"HTTP {resp.status}")
+        else: latencies.append((time.perf_counter() - t0) * 1000)
+    conn.close()
+
+def run(port, clients, total, make_request):
+    latencies, errors = [], []
+    per_client = total // clients
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        futures = [pool.submit(client_loop, port, per_client, make_request, latencies, errors) for _ in range(clients)]
+    for f in futures:
+        f.result()  # exception tak terduga di client ikut gagal, bukan hilang diam-diam
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    return len(latencies) / elapsed, np.percentile(lat, 50), np.percentile(lat, 99), errors
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--max-delay-ms', type=float, default=3.0)
+    args = parser.parse_args()
+
+    index = load_dataset_index()
+    service = ForecastService(index=index, max_delay_ms=args.max_delay_ms)
+    service.batcher.warm([(e, 'fusion') for e in EMITENS])
+    server = make_server(port=0, service=service)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    bodies = [json.dumps({'emiten': e, 'scenario': 'fusion', 'window': index.get_window(e).tolist()}) for e in EMITENS]
+    cases = {
+        'POST /forecast/window (batched)': lambda i: ('POST', '/forecast/window', bodies[i % len(bodies)]),
+        'GET /forecast/<EMITEN> (cached)': lambda i: ('GET', f'/forecast/{EMITENS[i % len(EMITENS)]}', None),
+    }
+    failed = 0
+    for name, make_request in cases.items():
+        failed += len(run(port, args.clients, args.clients * 2, make_request)[3])  # warmup koneksi & forecast cache
+        batches_before, requests_before = service.batcher.batches, service.batcher.requests
+        rps, p50, p99, errors = run(port, args.clients, args.requests, make_request)
+        n_batches = service.batcher.batches - batches_before
+        avg_batch = (service.batcher.requests - requests_before) / n_batches if n_batches else 0
+        print(f"{name:<34} {rps:8.1f} req/s  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  avg batch {avg_batch:5.1f}")
+        if errors: print(f"  {len(errors)} error, mis. {errors[0]}")
+        failed += len(errors)
+    server.shutdown()
+    if failed: raise SystemExit(f"GAGAL: {failed} request error")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Throughput inferensi banyak client paralel: thread di satu proses (GIL + satu runtime TF)
+vs ShardPool (worker proses per shard model, window lewat shared memory).
+
+Jalankan dari root repo: python -m benchmarks.bench_shard_pool [--workers 4] [--clients 16]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.data_loader import EMITENS, SCENARIOS, MODEL_FEATS
+from utils.forecast import model_inputs
+from utils.model_loader import get_model_registry, run_inference
+from utils.shard_pool import ShardPool
+
+KEYS = [(e, sc) for e in EMITENS for sc in SCENARIOS]
+
+def in_process(registry):
+    def predict(emiten, scenario, batch):
+        inputs = model_inputs(batch, scenario)
+        return run_inference(registry.get(emiten, scenario), inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+    return predict
+
+def run(predict, clients, per_client, batch_size):
+    rng = np.random.default_rng(0)
+    batch = rng.random((batch_size, 60, len(MODEL_FEATS)), dtype='float32')
+
+    def client(c):
+        for i in range(per_client):
+            emiten, scenario = KEYS[(c + i) % len(KEYS)]
+            predict(emiten, scenario, batch)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(client, range(clients)))
+    return clients * per_client / (time.perf_counter() - t0)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=20, help="Request per client")
+    parser.add_argument('--batch', type=int, default=1)
+    args = parser.parse_args()
+
+    registry = get_model_registry()
+    local = in_process(registry)
+    for emiten, scenario in KEYS:
+        local(emiten, scenario, np.zeros((args.batch, 60, len(MODEL_FEATS)), dtype='float32'))
+    rps = run(local, args.clients, args.requests, args.batch)
+    print(f"{'thread (1 proses)':<24} {rps:8.1f} req/s")
+
+    pool = ShardPool(**({'n_workers': args.workers} if args.workers else {}))
+    sharded = lambda e, sc, b: pool.predict(e, sc, b).result()
+    run(sharded, args.clients, 2, args.batch)
+    rps = run(sharded, args.clients, args.requests, args.batch)
+    print(f"{f'ShardPool ({len(pool.workers)} worker)':<24} {rps:8.1f} req/s")
+    pool.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark suite headless (tanpa server Streamlit, CPU-only) untuk hot path aplikasi:
+load dataset, filter per emiten, prepare_input_data, inferensi (single & batch) dan chart.
+Hasil disimpan ke benchmarks/results/ dan dibandingkan dengan benchmarks/baseline.json.
+
+Jalankan dari root repo:
+    python -m benchmarks.suite                  # jalankan + bandingkan dengan baseline
+    python -m benchmarks.suite --save-baseline  # jadikan hasil ini baseline baru
+    python -m benchmarks.suite --only inference --repeat 5
+Exit code 1 jika ada case yang lebih lambat dari baseline melebihi --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# --- RUNNER ---
+
+def measure(fn, repeat, warmup=1):
+    """
+    Jalankan fn() `repeat` kali (setelah warmup). fn boleh return int jumlah item
+    yang diproses per panggilan (untuk throughput); return value lain dihitung 1.
+    """
+    for _ in range(warmup):
+        fn()
+    times, items = [], 1
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+        items = out if isinstance(out, int) and out > 0 else 1
+    times_ms = np.array(times) * 1000
+    return {
+        'repeat': repeat,
+        'items': items,
+        'mean_ms': float(times_ms.mean()),
+        'p50_ms': float(np.percentile(times_ms, 50)),
+        'p95_ms': float(np.percentile(times_ms, 95)),
+        'min_ms': float(times_ms.min()),
+        'throughput_per_s': float(items / (np.median(times_ms) / 1000)),
+    }
+
+# --- CASES ---
+
+def dataset_cases(repeat):
+    import tempfile
+    from utils.data_loader import build_dataset, read_dataset_cache, write_dataset_cache, load_dataset
+
+    cache_path = os.path.join(tempfile.mkdtemp(), 'dataset.feather')
+    write_dataset_cache(build_dataset(), cache_path)
+    load_dataset()
+    return {
+        'dataset.cold_csv': measure(build_dataset, repeat),
+        'dataset.cold_feather': measure(lambda: read_dataset_cache(cache_path), repeat),
+        'dataset.warm': measure(load_dataset, repeat * 20),
+    }
+
+def filter_cases(repeat):
+    from utils.data_loader import load_dataset, load_dataset_index, prepare_input_data, EMITENS
+
+    df, index = load_dataset(), load_dataset_index()
+    frames = {e: index.get_emiten(e) for e in EMITENS}
+
+    def mask_filter():
+        for e in EMITENS:
+            df[df['relevant_issuer'] == e].sort_values('date')
+        return len(EMITENS)
+
+    def index_filter():
+        for e in EMITENS:
+            index.get_emiten(e)
+        return len(EMITENS)
+
+    def prepare_all():
+        for e in EMITENS:
+            prepare_input_data(frames[e])
+        return len(EMITENS)
+
+    return {
+        'filter.boolean_mask': measure(mask_filter, repeat),
+        'filter.index': measure(index_filter, repeat * 20),
+        'prepare_input_data': measure(prepare_all, repeat * 20),
+    }
+
+def inference_cases(repeat):
+    from utils.data_loader import EMITENS, SCENARIOS
+    from utils.forecast import forecast_all, predict_emiten
+    from utils.recursive import forecast_recursive
+    from utils.model_loader import get_model_registry
+
+    get_model_registry().warm_all()
+    results = {}
+    for scenario in SCENARIOS:
+        def single():
+            for e in EMITENS:
+                predict_emiten(e, scenario)
+            return len(EMITENS)
+        results[f'inference.single.{scenario}'] = measure(single, repeat)
+        results[f'inference.batched.{scenario}'] = measure(lambda: len(forecast_all(scenarios=[scenario])) // 3, repeat)
+    results['inference.batched.all'] = measure(lambda: len(forecast_all()) // 3, repeat)
+    # Semua emiten x skenario, 20 hari rekursif; items = jumlah path
+    results['inference.recursive.20d'] = measure(lambda: len(forecast_recursive(horizon=20)) // 20, repeat)
+    return results
+
+def plot_cases(repeat):
+    from utils.data_loader import load_dataset_index, EMITENS
+    from utils.plots import plot_advanced_technical, technical_figure
+
+    index = load_dataset_index()
+    df_e = index.get_emiten(EMITENS[0])
+    build = lambda: plot_advanced_technical(df_e, EMITENS[0], True, True, True, True)
+    fig = build()
+    return {
+        'plot.advanced_technical.build': measure(build, repeat),
+        'plot.advanced_technical.to_json': measure(lambda: fig.to_json(), repeat),
+        # Rerun dengan figure interaktif yang sudah di-cache (toggle indikator di browser)
+        'plot.technical_figure.cached': measure(lambda: technical_figure(df_e, EMITENS[0]), repeat),
+    }
+
+CASES = {
+    'dataset': dataset_cases,
+    'filter': filter_cases,
+    'inference': inference_cases,
+    'plot': plot_cases,
+}
+
+# --- BASELINE ---
+
+def compare(results, baseline, threshold):
+    """
+    Bandingkan p50 per case. Return list (case, base_ms, now_ms, ratio, regressed).
+    """
+    rows = []
+    for name, r in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append((name, None, r['p50_ms'], None, False))
+            continue
+        ratio = r['p50_ms'] / base['p50_ms'] if base['p50_ms'] > 0 else 1.0
+        rows.append((name, base['p50_ms'], r['p50_ms'], ratio, ratio > 1 + threshold))
+    return rows
+
+def environment():
+    info = {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()}
+    for mod in ('numpy', 'pandas', 'tensorflow', 'plotly'):
+        if mod in sys.modules: info[mod] = getattr(sys.modules[mod], '__version__', None)
+    return info
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite stock-price-forecasting.")
+    parser.add_argument('--only', nargs='*', choices=list(CASES), help="Grup case yang dijalankan (default semua)")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--threshold', type=float, default=0.25, help="Toleransi regresi p50 (0.25 = 25%% lebih lambat)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    results = {}
+    for group in args.only or list(CASES):
+        print(f"[{group}] ...", flush=True)
+        results.update(CASES[group](args.repeat))
+
+    payload = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'env': environment(), 'results': results}
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"\n{'case':<40} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>12} {'baseline':>10} {'ratio':>7}")
+    regressions = []
+    for name, base_ms, now_ms, ratio, regressed in compare(results, baseline, args.threshold):
+        r = results[name]
+        base_txt = f"{base_ms:10.3f}" if base_ms is not None else f"{'-':>10}"
+        ratio_txt = f"{ratio:6.2f}x" if ratio is not None else f"{'-':>7}"
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:<40} {now_ms:10.3f} {r['p95_ms']:10.3f} {r['throughput_per_s']:12.1f} {base_txt} {ratio_txt}{flag}")
+        if regressed: regressions.append(name)
+    print(f"\nHasil: {out_path}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(payload, f, indent=2)
+        print(f"Baseline disimpan: {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} case melambat > {args.threshold:.0%} dari baseline")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
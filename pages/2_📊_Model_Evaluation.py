@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_evaluation_files
+from utils.st_adapter import load_evaluation_files
 
 st.set_page_config(page_title="Model Evaluation", page_icon="📊", layout="wide")
 with open('style.css') as f: st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_shap_data, EMITENS
+from utils.st_adapter import load_shap_cube, EMITENS
 from utils.plots import plot_interactive_shap
+from utils.explain import explain_window
 
 # 1. PAGE CONFIG
 st.set_page_config(
@@ -27,9 +28,9 @@ st.markdown("""
 st.divider()
 
 # 4. LOAD DATA SHAP (Dari CSV, bukan Gambar!)
-df_shap = load_shap_data()
+shap_cube = load_shap_cube()
 
-if not df_shap.empty:
+if shap_cube.scenarios:
     # --- LAYOUT KONTROL ---
     # Kita buat layout yang bersih: Kiri untuk kontrol, Kanan untuk visualisasi
     col_ctrl, col_viz = st.columns([1, 3])
@@ -43,10 +44,16 @@ if not df_shap.empty:
             ["Global Overview (Rata-rata)", "Analisis Per Emiten"]
         )
         
+        # Baseline (teknikal saja) & fusion (teknikal + sentimen) dianalisis terpisah
+        idx_scn = shap_cube.scenarios.index('fusion') if 'fusion' in shap_cube.scenarios else 0
+        scenario = st.selectbox("Pilih Skenario Model:", shap_cube.scenarios, index=idx_scn, format_func=str.capitalize)
+        
         st.markdown("---")
         
         if view_mode == "Analisis Per Emiten":
             selected_emiten = st.selectbox("Pilih Saham:", EMITENS)
+            # Live: atribusi dihitung dari window 60 hari terakhir, sama dengan input forecast
+            live_mode = st.toggle("Penjelasan live (window terakhir)", value=False)
             
             # Tampilkan info singkat emiten
             st.info(f"""
@@ -78,23 +85,31 @@ if not df_shap.empty:
 
     with col_viz:
         # --- LOGIKA VISUALISASI ---
+        x_title = "Mean |SHAP Value| (Impact Magnitude)"
         if view_mode == "Global Overview (Rata-rata)":
-            # Agregasi Rata-rata Global
-            df_viz = df_shap.groupby(['Feature', 'Feature Name', 'Category'])['Importance'].mean().reset_index()
-            title_chart = "Global Feature Importance (Rata-rata Seluruh Emiten)"
+            # Agregasi Rata-rata Global (sudah dihitung di cube)
+            df_viz = shap_cube.view(scenario)
+            title_chart = f"Global Feature Importance - {scenario.capitalize()} (Rata-rata Seluruh Emiten)"
             
             # Insight Box Dinamis
-            top_3 = df_viz.sort_values('Importance', ascending=False).head(3)['Feature Name'].tolist()
+            top_3 = shap_cube.top_k(scenario, k=3)['Feature Name'].tolist()
             st.success(f"💡 **Insight Global:** Tiga faktor penentu utama di pasar saat ini adalah **{', '.join(top_3)}**.")
             
         else:
             # Filter Per Emiten
-            df_viz = df_shap[df_shap['Emiten'] == selected_emiten].copy()
-            title_chart = f"Feature Importance: {selected_emiten}"
+            df_viz = shap_cube.view(scenario, selected_emiten)
+            title_chart = f"Feature Importance: {selected_emiten} ({scenario.capitalize()})"
+            if live_mode:
+                df_live = explain_window(selected_emiten, scenario)
+                if df_live is not None:
+                    df_viz = df_live
+                    title_chart = f"Live Feature Attribution: {selected_emiten} ({scenario.capitalize()}, Window Terakhir)"
+                    x_title = "|Shapley Value| (Rata-rata H+1..H+3, Skala Model)"
+                else:
+                    st.warning(f"Penjelasan live untuk {selected_emiten} tidak tersedia, menampilkan ringkasan offline.")
             
             # Cek apakah Sentimen masuk Top 3?
-            df_sorted = df_viz.sort_values('Importance', ascending=False)
-            top_3_cats = df_sorted.head(3)['Category'].tolist()
+            top_3_cats = df_viz.head(3)['Category'].tolist()
             
             if 'Sentiment' in top_3_cats:
                 st.warning(f"🔥 **High Impact Sentiment:** Pada {selected_emiten}, fitur Sentimen memiliki pengaruh yang signifikan (Masuk Top 3)!")
@@ -102,13 +117,13 @@ if not df_shap.empty:
                 st.info(f"📉 **Dominasi Teknikal:** Pergerakan {selected_emiten} murni didorong oleh faktor teknikal. Sentimen belum terlalu berpengaruh.")
 
         # --- TAMPILKAN PLOTLY (INTERAKTIF) ---
-        fig = plot_interactive_shap(df_viz, title_chart)
+        fig = plot_interactive_shap(df_viz, title_chart, x_title)
         st.plotly_chart(fig, use_container_width=True)
         
         # --- DATA TABLE (EXPANDER) ---
         with st.expander("📄 Lihat Data Mentah (Tabel Angka)"):
             st.dataframe(
-                df_viz.sort_values('Importance', ascending=False)[['Feature Name', 'Category', 'Importance']], 
+                df_viz[['Feature Name', 'Category', 'Importance']], 
                 use_container_width=True,
                 hide_index=True
             )
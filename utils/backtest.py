@@ -0,0 +1,145 @@
+"""
+Rolling-origin backtest: bangun ulang tabel_dm_test.csv dan df_horizon.xlsx dari model & dataset.
+
+Jalankan dari root repo: python -m utils.backtest [--write] [--test-ratio 0.2]
+"""
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.data_loader import (
+    load_dataset_index,
+    load_evaluation_files,
+    EMITENS,
+    SCENARIOS,
+    IDX_QUANT,
+    IDX_QUAL
+)
+from utils.model_loader import get_model_registry
+
+HORIZON = 3
+DM_PATH = os.path.join('data', 'tabel_dm_test.csv')
+HORIZON_PATH = os.path.join('data', 'df_horizon.xlsx')
+
+# --- WINDOWS ---
+
+def build_backtest_windows(block, denorm, window_size=60, horizon=HORIZON, test_ratio=0.2):
+    """
+    Semua window 60 hari (view sliding_window_view, tanpa copy) + target Yt H+1..H+h.
+    Hanya `test_ratio` window terakhir yang dievaluasi (rolling origin di periode uji).
+    Return (windows (N, window, 11) ter-scale, targets (N, h) dalam Rupiah).
+    """
+    feats = block.snapshot().feats  # satu versi blok untuk window & target
+    scaled = denorm.transform(feats, block.ticker)
+    n = len(scaled) - window_size - horizon + 1
+    if n <= 0: return None, None
+    windows = sliding_window_view(scaled, window_size, axis=0).transpose(0, 2, 1)[:n]
+    price = feats[:, 0].astype('float64')
+    targets = sliding_window_view(price[window_size:], horizon)[:n]
+
+    n_test = max(1, int(round(n * test_ratio))) if test_ratio < 1 else n
+    return windows[-n_test:], targets[-n_test:]
+
+# --- STATISTICS ---
+
+def diebold_mariano(err_a, err_b, h=1):
+    """
+    Uji Diebold-Mariano dengan loss MSE. d = e_a^2 - e_b^2; DM < 0 berarti model A lebih akurat.
+    Varians memakai autokovarians sampai lag h-1. Return (DM, p-value dua sisi).
+    """
+    d = np.asarray(err_a, dtype='float64') ** 2 - np.asarray(err_b, dtype='float64') ** 2
+    T = len(d)
+    d_centered = d - d.mean()
+    gamma = [np.dot(d_centered[k:], d_centered[:T - k]) / T for k in range(h)]
+    var_d = (gamma[0] + 2 * sum(gamma[1:])) / T
+    if var_d <= 0: return 0.0, 1.0
+    dm = d.mean() / math.sqrt(var_d)
+    p_value = math.erfc(abs(dm) / math.sqrt(2))
+    return dm, p_value
+
+def dm_conclusion(dm, p_value, alpha=0.05):
+    if p_value >= alpha: return 'Seri'
+    return 'BASELINE (Win)' if dm < 0 else 'FUSION (Win)'
+
+# --- ENGINE ---
+
+def run_backtest(emitens=EMITENS, window_size=60, test_ratio=0.2, index=None):
+    """
+    Prediksi semua window uji untuk semua emiten x skenario dalam satu call batch.
+    Return dict (emiten, scenario) -> (pred (N, 3) Rupiah, target (N, 3)).
+    """
+    index = index if index is not None else load_dataset_index()
+    registry = get_model_registry()
+    denorm = registry.scalers.denormalizer(emitens)
+
+    windows, targets = {}, {}
+    for emiten in emitens:
+        block = index.get_block(emiten)
+        if block is None or emiten not in denorm: continue
+        w, y = build_backtest_windows(block, denorm, window_size, HORIZON, test_ratio)
+        if w is None: continue
+        windows[emiten], targets[emiten] = w, y
+
+    keys = [(e, sc) for e in windows for sc in SCENARIOS]
+    grouped = registry.get_group(keys)
+    if grouped is None: return {}
+
+    inputs = []
+    for emiten, scenario in keys:
+        w = windows[emiten]
+        inputs.append(np.ascontiguousarray(w[..., IDX_QUANT]))
+        if scenario == 'fusion': inputs.append(np.ascontiguousarray(w[..., IDX_QUAL]))
+    outputs = grouped.predict_on_batch(inputs)
+
+    results = {}
+    for (emiten, scenario), pred_sc in zip(keys, outputs):
+        results[(emiten, scenario)] = (denorm.inverse_price(pred_sc, emiten), targets[emiten])
+    return results
+
+def evaluation_tables(results, horizon_scenario='baseline'):
+    """
+    Susun hasil backtest ke skema tabel_dm_test.csv dan df_horizon.xlsx.
+    """
+    emitens = sorted({e for e, _ in results})
+    dm_rows, horizon_rows = [], []
+    for emiten in emitens:
+        if (emiten, 'baseline') in results and (emiten, 'fusion') in results:
+            pred_b, y = results[(emiten, 'baseline')]
+            pred_f, _ = results[(emiten, 'fusion')]
+            dm, p_value = diebold_mariano(y[:, 0] - pred_b[:, 0], y[:, 0] - pred_f[:, 0], h=1)
+            dm_rows.append({'Emiten': emiten, 'DM Statistic': round(dm, 4), 'P-Value': round(p_value, 4),
+                            'Kesimpulan': dm_conclusion(dm, p_value)})
+        if (emiten, horizon_scenario) in results:
+            pred, y = results[(emiten, horizon_scenario)]
+            mape = (np.abs(pred - y) / np.abs(y)).mean(axis=0) * 100
+            row = {'Emiten': emiten}
+            row.update({f'MAPE H+{h + 1}': f'{mape[h]:.2f}%' for h in range(len(mape))})
+            horizon_rows.append(row)
+    return pd.DataFrame(dm_rows), pd.DataFrame(horizon_rows)
+
+def write_evaluation_files(df_dm, df_horizon, dm_path=DM_PATH, horizon_path=HORIZON_PATH):
+    df_dm.to_csv(dm_path, index=False)
+    df_horizon.to_excel(horizon_path)
+    load_evaluation_files.clear()
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-evaluasi model baseline vs fusion.")
+    parser.add_argument('--test-ratio', type=float, default=0.2)
+    parser.add_argument('--horizon-scenario', default='baseline', choices=SCENARIOS)
+    parser.add_argument('--write', action='store_true', help="Timpa file evaluasi di data/")
+    args = parser.parse_args()
+
+    results = run_backtest(test_ratio=args.test_ratio)
+    df_dm, df_horizon = evaluation_tables(results, args.horizon_scenario)
+    print(df_dm.to_string(index=False))
+    print(df_horizon.to_string(index=False))
+    if args.write:
+        write_evaluation_files(df_dm, df_horizon)
+        print(f"Ditulis ke {DM_PATH} dan {HORIZON_PATH}")
+
+if __name__ == '__main__':
+    main()
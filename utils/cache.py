@@ -0,0 +1,156 @@
+"""
+Memoization tanpa Streamlit untuk data layer: bisa dipakai di worker multiprocessing,
+cron job, atau API standalone. Backend dipilih per fungsi atau lewat DATA_CACHE_BACKEND:
+  'memory' : LRU in-process, objek dishare tanpa copy/pickle (perlakukan read-only)
+  'disk'   : LRU + pickle di data/cache/memo, bertahan antar proses & restart
+  'none'   : selalu hitung ulang
+"""
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+DATA_CACHE_BACKEND = os.environ.get('DATA_CACHE_BACKEND', 'memory')
+MEMO_DIR = os.path.join('data', 'cache', 'memo')
+
+logger = logging.getLogger(__name__)
+
+# --- BACKENDS ---
+
+class LRUCache:
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries: return None, False
+            self._entries.move_to_end(key)
+            return self._entries[key], True
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class DiskCache(LRUCache):
+    """
+    LRU in-memory di depan file pickle per key; proses lain yang memakai
+    cache_dir yang sama ikut mendapat hasilnya tanpa menghitung ulang.
+    """
+    def __init__(self, name, maxsize=32, cache_dir=MEMO_DIR):
+        super().__init__(maxsize)
+        self.name = name
+        self.cache_dir = cache_dir
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{self.name}-{key}.pkl')
+
+    def get(self, key):
+        value, found = super().get(key)
+        if found: return value, True
+        try:
+            with open(self._path(key), 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None, False
+        super().put(key, value)
+        return value, True
+
+    def put(self, key, value):
+        super().put(key, value)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning("Gagal menulis memo %s: %s", self.name, e)
+
+    def clear(self):
+        super().clear()
+        if not os.path.isdir(self.cache_dir): return
+        for fname in os.listdir(self.cache_dir):
+            if fname.startswith(f'{self.name}-'):
+                try: os.remove(os.path.join(self.cache_dir, fname))
+                except OSError: pass
+
+class NullCache:
+    def get(self, key):
+        return None, False
+
+    def put(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+def make_backend(backend, name, maxsize):
+    if backend == 'disk': return DiskCache(name, maxsize)
+    if backend == 'none': return NullCache()
+    return LRUCache(maxsize)
+
+# --- DECORATOR ---
+
+def _file_signature(paths):
+    sig = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            sig.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            sig.append((path, None, None))
+    return sig
+
+def memoize(backend=None, maxsize=32, depends_on=()):
+    """
+    Decorator cache hasil fungsi per argumen. `depends_on`: path file sumber;
+    jika mtime/ukurannya berubah, key ikut berubah sehingga hasil lama tidak dipakai.
+    Fungsi hasil dekorasi punya .clear() (kompatibel dengan pola st.cache_*.clear()).
+    """
+    def decorator(fn):
+        name = f'{fn.__module__}.{fn.__qualname__}'
+        cache = make_backend(backend or DATA_CACHE_BACKEND, name, maxsize)
+        key_locks = {}  # key -> [lock, jumlah pemanggil aktif]; dihapus saat tidak ada yang memakai
+        guard = threading.Lock()
+
+        def make_key(args, kwargs):
+            raw = repr((args, sorted(kwargs.items()), _file_signature(depends_on)))
+            return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            value, found = cache.get(key)
+            if found: return value
+            # Satu pemanggil yang menghitung, pemanggil lain dengan key sama menunggu
+            with guard:
+                entry = key_locks.setdefault(key, [threading.Lock(), 0])
+                entry[1] += 1
+            try:
+                with entry[0]:
+                    value, found = cache.get(key)
+                    if found: return value
+                    value = fn(*args, **kwargs)
+                    cache.put(key, value)
+                    return value
+            finally:
+                with guard:
+                    entry[1] -= 1
+                    if entry[1] == 0: del key_locks[key]
+
+        wrapper.clear = cache.clear
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -1,47 +1,123 @@
-import streamlit as st
+"""
+Data layer murni (tanpa Streamlit): bisa dipakai dari worker, cron job atau API.
+Caching lewat utils.cache.memoize; adapter Streamlit ada di utils.st_adapter.
+"""
 import pandas as pd
 import os
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from tensorflow.keras.layers import InputLayer
-from sklearn.preprocessing import MinMaxScaler
+import logging
+
+from utils.cache import memoize
+from utils.metrics import metrics, timer, timed
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow opsional: tanpa itu dataset selalu dibangun dari CSV
+    feather = None
 
 # --- KONSTANTA ---
 EMITENS = ['ARTO', 'BBCA', 'BBNI', 'BBRI', 'BBTN', 'BMRI', 'BRIS', 'GOTO']
 MODEL_FEATS = ['Yt', 'X1', 'X2', 'X3', 'X4', 'X5', 'X6', 'X7', 'X8', 'X9', 'X10']
 IDX_QUAL = [7, 8, 9, 10]
 IDX_QUANT = [0, 1, 2, 3, 4, 5, 6]
-
-# --- CLASSES UNTUK PATCHING ---
-class PatchedDTypePolicy:
-    def __init__(self, **kwargs):
-        self.name = "float32"
-    def get_config(self):
-        return {"name": "float32"}
-
-class PatchedInputLayer(InputLayer):
-    def __init__(self, **kwargs):
-        if 'batch_shape' in kwargs: kwargs['batch_input_shape'] = kwargs.pop('batch_shape')
-        if 'dtype_policy' in kwargs: kwargs.pop('dtype_policy'); kwargs['dtype'] = 'float32'
-        if 'sparse' in kwargs: kwargs['sparse'] = bool(kwargs['sparse'])
-        super().__init__(**kwargs)
+SENTIMENT_COLS = ['X7', 'X8', 'X9', 'X10']
+# Mapping kolom data numerik baru -> nama fitur model lama
+RENAME_MAP = {
+    'Close': 'Yt', 'Open': 'X1', 'High': 'X2', 'Low': 'X3',
+    'Volume': 'X4', 'macd': 'X5', 'rsi': 'X6'
+}
+SCENARIOS = ['baseline', 'fusion']
+MODEL_DIR = 'models'
+
+SHAP_PATH = os.path.join('data', 'shap_values_summary.csv')
+EVALUATION_PATHS = [os.path.join('data', 'tabel_dm_test.csv'), os.path.join('data', 'df_horizon.xlsx')]
+DATASET_SOURCES = [os.path.join('data', 'df_numerik_final.csv'), os.path.join('data', 'df_sentiment_features_daily.csv')]
+# INDICATOR_MODE: 'fill' (isi hanya nilai indikator yang kosong) atau 'recompute' (hitung ulang semua)
+INDICATOR_MODE = os.environ.get('INDICATOR_MODE', 'fill')
+# Naikkan versi jika skema kolom atau rumus indikator dataset berubah agar cache lama tidak terpakai;
+# satu file per INDICATOR_MODE karena isi X5/X6 berbeda antar mode
+DATASET_CACHE_VERSION = 3
+DATASET_CACHE_PATH = os.path.join('data', 'cache', f'dataset_v{DATASET_CACHE_VERSION}_{INDICATOR_MODE}.feather')
+
+logger = logging.getLogger(__name__)
 
 # --- DATA LOADING & MERGING ---
 
-@st.cache_data
+@memoize(depends_on=[SHAP_PATH])
 def load_shap_data():
     """
     Load data SHAP summary untuk visualisasi interaktif.
     """
-    path = os.path.join('data', 'shap_values_summary.csv')
+    path = SHAP_PATH
     if os.path.exists(path):
         df = pd.read_csv(path)
         return df
     else:
         return pd.DataFrame() # Return empty if not found
 
-@st.cache_data
+@memoize(backend='memory', maxsize=1, depends_on=[SHAP_PATH])
+def load_shap_cube():
+    """
+    Cube agregasi SHAP (emiten, scenario, feature) di atas load_shap_data():
+    rata-rata global, ranking & frame per scenario sudah dihitung.
+    """
+    from utils.shap_cube import ShapCube
+    return ShapCube.from_frame(load_shap_data())
+
+def dataset_cache_is_fresh(cache_path=DATASET_CACHE_PATH, sources=DATASET_SOURCES):
+    """
+    Cache valid jika ada dan lebih baru dari semua CSV sumber.
+    """
+    if feather is None or not os.path.exists(cache_path): return False
+    cache_mtime = os.path.getmtime(cache_path)
+    return all(not os.path.exists(src) or os.path.getmtime(src) <= cache_mtime for src in sources)
+
+def read_dataset_cache(cache_path=DATASET_CACHE_PATH):
+    """
+    Baca cache Feather (uncompressed) lewat memory-map; kolom numerik tanpa NaN
+    bisa dipakai pandas tanpa copy.
+    """
+    try:
+        table = feather.read_table(cache_path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+    except Exception as e:
+        logger.warning("Gagal membaca cache dataset %s (%s), rebuild dari CSV", cache_path, e)
+        return None
+
+def write_dataset_cache(df, cache_path=DATASET_CACHE_PATH):
+    if feather is None: return False
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Tulis ke file sementara lalu rename agar pembaca lain tidak melihat file setengah jadi
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, cache_path)
+        return True
+    except Exception as e:
+        logger.warning("Gagal menulis cache dataset %s (%s)", cache_path, e)
+        return False
+
+# Frame besar selalu di memori proses (Feather sudah jadi cache disk-nya)
+@memoize(backend='memory', maxsize=1)
 def load_dataset():
+    """
+    Load dataset gabungan. Pakai cache Feather (memory-mapped) jika lebih baru
+    dari CSV sumber, jika tidak dibangun ulang dari CSV lalu cache ditulis ulang.
+    Frame dishare antar sesi tanpa copy: perlakukan sebagai read-only.
+    """
+    with timer('data.load_dataset'):
+        if dataset_cache_is_fresh():
+            with timer('data.feather_read'):
+                df = read_dataset_cache()
+            metrics.hit('dataset_feather', df is not None)
+            if df is not None: return df
+        else:
+            metrics.hit('dataset_feather', False)
+
+        df_final = build_dataset()
+        if not df_final.empty: write_dataset_cache(df_final)
+        return df_final
+
+def build_dataset():
     """
     Load Numerik + Sentimen dengan LEFT JOIN agar data harga tidak hilang.
     """
@@ -50,89 +126,94 @@ def load_dataset():
     
     # 1. Load Data Numerik (MASTER DATA)
     if os.path.exists(path_num):
-        df_num = pd.read_csv(path_num)
+        with timer('data.csv_parse'):
+            df_num = pd.read_csv(path_num)
         df_num['date'] = pd.to_datetime(df_num['date'])
         # Bersihkan spasi di nama emiten (PENTING!)
         df_num['relevant_issuer'] = df_num['relevant_issuer'].astype(str).str.strip()
     else:
-        st.error(f"❌ File Numerik hilang: {path_num}")
+        logger.error("File Numerik hilang: %s", path_num)
         return pd.DataFrame()
 
     # 2. Load Data Sentimen
     if os.path.exists(path_sen):
-        df_sen = pd.read_csv(path_sen)
+        with timer('data.csv_parse'):
+            df_sen = pd.read_csv(path_sen)
         df_sen['date'] = pd.to_datetime(df_sen['date'])
         df_sen['relevant_issuer'] = df_sen['relevant_issuer'].astype(str).str.strip()
+        # Baris sentimen susulan (ingest) menimpa baris lama agar merge tidak menggandakan harga
+        df_sen = df_sen.drop_duplicates(['date', 'relevant_issuer'], keep='last')
     else:
         df_sen = pd.DataFrame()
 
     # 3. Merge Data (LEFT JOIN)
     # Gunakan 'left' agar semua data harga tetap ada, meski sentimen kosong.
     if not df_sen.empty:
-        df_final = pd.merge(df_num, df_sen, on=['date', 'relevant_issuer'], how='left')
+        with timer('data.merge'):
+            df_final = pd.merge(df_num, df_sen, on=['date', 'relevant_issuer'], how='left')
         
         # Isi NaN Sentimen dengan 0 (Asumsi Netral/Tidak ada berita)
-        cols_sentimen = ['X7', 'X8', 'X9', 'X10'] 
+        cols_sentimen = SENTIMENT_COLS
         # Cek nama kolom di df_sen, kadang nama aslinya beda, tapi di merge harusnya aman
         # Jika nama kolom di CSV sentimen Anda X7, X8, dst, maka:
         df_final[cols_sentimen] = df_final[cols_sentimen].fillna(0)
     else:
         df_final = df_num
-        for col in ['X7', 'X8', 'X9', 'X10']:
+        for col in SENTIMENT_COLS:
             df_final[col] = 0.0
 
     # 4. RENAME Columns (Mapping Data Baru -> Model Lama)
-    rename_map = {
-        'Close': 'Yt', 'Open': 'X1', 'High': 'X2', 'Low': 'X3',
-        'Volume': 'X4', 'macd': 'X5', 'rsi': 'X6'
-    }
-    
     available_cols = df_final.columns
-    rename_dict_clean = {k: v for k, v in rename_map.items() if k in available_cols}
+    rename_dict_clean = {k: v for k, v in RENAME_MAP.items() if k in available_cols}
     df_final = df_final.rename(columns=rename_dict_clean)
 
     # 5. FINAL CHECK & SORT
     df_final = df_final.sort_values(['relevant_issuer', 'date']).reset_index(drop=True)
+
+    # 6. INDIKATOR TEKNIKAL (X5/X6 + signal/hist, MA20) untuk semua emiten sekaligus
+    with timer('data.indicators'):
+        df_final = apply_indicators(df_final, INDICATOR_MODE)
+
+    # 7. TYPING (kategori emiten terurut -> urutan sort tetap sama)
+    df_final['relevant_issuer'] = pd.Categorical(df_final['relevant_issuer'])
     return df_final
 
-@st.cache_data
+def apply_indicators(df, mode='fill'):
+    """
+    Lengkapi kolom indikator dari utils.indicators (frame harus sorted per emiten, tanggal).
+    mode='fill' hanya mengisi nilai kosong, 'recompute' menimpa semuanya.
+    """
+    if df.empty or 'Yt' not in df.columns: return df
+    from utils.indicators import compute_indicators
+    values, _ = compute_indicators(df['Yt'].to_numpy(), df['relevant_issuer'].to_numpy())
+    targets = {'X5': 'macd', 'macd_signal': 'macd_signal', 'macd_hist': 'macd_hist', 'X6': 'rsi', 'ma20': 'ma20'}
+    for col, key in targets.items():
+        if mode == 'recompute' or col not in df.columns:
+            df[col] = values[key]
+        else:
+            df[col] = df[col].fillna(pd.Series(values[key], index=df.index))
+    return df
+
+@memoize(backend='memory', maxsize=1)
+def load_dataset_index():
+    """
+    Index per emiten (blok contiguous + akses window) di atas load_dataset().
+    Matriks fitur diambil dari feature store memory-mapped (dishare antar proses).
+    """
+    from utils.dataset_index import DatasetIndex
+    from utils.feature_store import get_feature_store
+    df = load_dataset()
+    return DatasetIndex.from_frame(df, get_feature_store(df))
+
+@memoize(depends_on=EVALUATION_PATHS)
 def load_evaluation_files():
-    dm_path = os.path.join('data', 'tabel_dm_test.csv')
-    horizon_path = os.path.join('data', 'df_horizon.xlsx')
+    dm_path, horizon_path = EVALUATION_PATHS
     df_dm = pd.read_csv(dm_path) if os.path.exists(dm_path) else None
     try: df_horizon = pd.read_excel(horizon_path) if os.path.exists(horizon_path) else None
     except: df_horizon = None
     return df_dm, df_horizon
 
-def load_prediction_model(emiten, scenario):
-    try:
-        model_filename = f'model_{scenario}_{emiten}.h5'
-        model_path = os.path.join('models', model_filename)
-        if not os.path.exists(model_path): return None, None
-
-        custom_objects = {'InputLayer': PatchedInputLayer, 'DTypePolicy': PatchedDTypePolicy}
-        model = load_model(model_path, custom_objects=custom_objects)
-
-        # Auto-Fit Scaler
-        df_full = load_dataset()
-        if df_full.empty: return None, None
-        df_e = df_full[df_full['relevant_issuer'] == emiten]
-        
-        # Validasi kolom lengkap
-        missing_cols = [c for c in MODEL_FEATS if c not in df_e.columns]
-        if missing_cols:
-             # st.error(f"Kolom kurang: {missing_cols}") # Debug only
-             return None, None
-
-        data_vals = df_e[MODEL_FEATS].values.astype('float32')
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        scaler.fit(data_vals) 
-        
-        return model, scaler
-
-    except Exception as e:
-        return None, None
-
+@timed('data.prepare_input')
 def prepare_input_data(df_emiten, window_size=60):
     if len(df_emiten) < window_size: return None
     return df_emiten[MODEL_FEATS].tail(window_size).values.astype('float32')
\ No newline at end of file
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import MODEL_FEATS
+from utils.metrics import timed
+
+class BlockSnapshot:
+    """
+    Versi data satu emiten yang tidak pernah berubah setelah dipublikasikan: kolom,
+    tanggal dan matriks fitur selalu dari versi yang sama.
+    """
+    __slots__ = ('columns', 'dates', 'feats', '_frame')
+
+    def __init__(self, columns, feats):
+        self.columns = columns
+        self.dates = columns['date']
+        self.feats = feats
+        self._frame = None
+
+    def __len__(self):
+        return len(self.dates)
+
+    def frame(self):
+        # Dibuat sekali per snapshot; race dua pembaca hanya membangun frame identik dua kali
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, copy=False)
+        return self._frame
+
+    def position(self, end_date=None):
+        """
+        Posisi eksklusif baris terakhir dengan date <= end_date (default: akhir blok).
+        """
+        if end_date is None: return len(self.dates)
+        return int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date)), side='right'))
+
+class EmitenBlock:
+    """
+    Data satu emiten: kolom contiguous terurut tanggal + matriks fitur model (n, 11).
+    Awalnya semua array adalah view read-only ke buffer milik DatasetIndex (tanpa copy);
+    saat ada append/update, blok pindah ke buffer privat yang tumbuh 2x (amortized O(1) per baris).
+    Pembaca mengambil snapshot() sekali per operasi; writer mempublikasikan versi baru
+    dengan satu assignment referensi, jadi tanggal & fitur tidak pernah tercampur antar versi.
+    """
+    def __init__(self, ticker, columns, feats):
+        self.ticker = ticker
+        self._snapshot = BlockSnapshot(columns, feats)
+        self._buffers = None  # kolom -> buffer privat (kapasitas >= len)
+        self._feats_buffer = None
+
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def columns(self):
+        return self._snapshot.columns
+
+    @property
+    def dates(self):
+        return self._snapshot.dates
+
+    @property
+    def feats(self):
+        return self._snapshot.feats
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def frame(self):
+        """
+        DataFrame zero-copy di atas kolom blok (dibuat sekali per versi, lalu di-reuse).
+        """
+        return self._snapshot.frame()
+
+    def position(self, end_date=None):
+        return self._snapshot.position(end_date)
+
+    def _ensure_capacity(self, needed, copy=False):
+        # copy=True: selalu pindah ke buffer baru (baris lama akan ditimpa, snapshot lama harus utuh)
+        capacity = len(self._feats_buffer) if self._feats_buffer is not None else 0
+        if self._buffers is not None and capacity >= needed and not copy: return
+        snap = self._snapshot
+        n = len(snap)
+        capacity = max(needed, 2 * max(capacity, n), 16)
+        buffers = {}
+        for col, arr in snap.columns.items():
+            if col == 'relevant_issuer': continue
+            buf = np.empty(capacity, dtype=arr.dtype)
+            buf[:n] = arr
+            buffers[col] = buf
+        feats = np.empty((capacity, snap.feats.shape[1]), dtype=snap.feats.dtype)
+        feats[:n] = snap.feats
+        self._buffers, self._feats_buffer = buffers, feats
+
+    def _publish(self, n):
+        # View baru ke buffer privat; snapshot & frame lama yang sudah dibagikan tetap valid
+        columns = {col: buf[:n] for col, buf in self._buffers.items()}
+        feats = self._feats_buffer[:n]
+        for arr in list(columns.values()) + [feats]:
+            arr.flags.writeable = False
+        columns['relevant_issuer'] = pd.Categorical.from_codes(np.zeros(n, dtype='int8'), [self.ticker])
+        self._snapshot = BlockSnapshot(columns, feats)
+
+    def append(self, new_columns, feat_names):
+        """
+        Tambah baris baru di ujung blok. new_columns: kolom -> array (tanggal harus > tanggal terakhir).
+        Kolom yang tidak diberikan diisi NaN.
+        """
+        n_new = len(new_columns['date'])
+        if n_new == 0: return
+        n = len(self)
+        self._ensure_capacity(n + n_new)
+        for col, buf in self._buffers.items():
+            values = new_columns.get(col)
+            buf[n:n + n_new] = values if values is not None else np.nan
+        self._feats_buffer[n:n + n_new] = np.column_stack([self._buffers[c][n:n + n_new] for c in feat_names])
+        self._publish(n + n_new)
+
+    def update(self, positions, new_columns, feat_names):
+        """
+        Timpa nilai kolom pada baris tertentu (mis. sentimen yang datang terlambat).
+        """
+        if len(positions) == 0: return
+        # Copy-on-write: baris yang ditimpa masih dilihat pembaca snapshot lama
+        self._ensure_capacity(len(self), copy=True)
+        for col, values in new_columns.items():
+            if col in self._buffers: self._buffers[col][positions] = values
+        self._feats_buffer[positions] = np.column_stack([self._buffers[c][positions] for c in feat_names])
+        self._publish(len(self))
+
+class DatasetIndex:
+    """
+    Index terpartisi per emiten di atas frame load_dataset() (sorted issuer, date).
+    Menggantikan df[df['relevant_issuer'] == x].sort_values('date') di setiap rerun.
+    """
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    @classmethod
+    def from_frame(cls, df, store=None):
+        """
+        store: FeatureStore opsional; jika layout-nya cocok, matriks fitur tiap blok adalah
+        view ke mmap bersama (tanpa salinan float32 per proses).
+        """
+        if df.empty: return cls({})
+        issuers = df['relevant_issuer'].astype(str).to_numpy()
+        # Batas blok: frame sudah sorted per emiten, cukup cari titik pergantian
+        cuts = np.flatnonzero(issuers[1:] != issuers[:-1]) + 1
+        starts = np.concatenate([[0], cuts])
+        stops = np.concatenate([cuts, [len(df)]])
+
+        arrays = {col: df[col].to_numpy() for col in df.columns if col != 'relevant_issuer'}
+        if store is not None and store.matches(issuers[starts], starts, stops):
+            feats = store.feats
+        elif all(c in df.columns for c in MODEL_FEATS):
+            feats = np.ascontiguousarray(df[MODEL_FEATS].to_numpy(dtype='float32'))
+        else:
+            feats = None
+        for arr in arrays.values():
+            arr.flags.writeable = False
+        if feats is not None: feats.flags.writeable = False
+
+        blocks = {}
+        for start, stop in zip(starts, stops):
+            ticker = issuers[start]
+            columns = {col: arr[start:stop] for col, arr in arrays.items()}
+            columns['relevant_issuer'] = pd.Categorical.from_codes(np.zeros(stop - start, dtype='int8'), [ticker])
+            blocks[ticker] = EmitenBlock(ticker, columns, feats[start:stop] if feats is not None else None)
+        return cls(blocks)
+
+    def __contains__(self, ticker):
+        return ticker in self.blocks
+
+    def tickers(self):
+        return list(self.blocks)
+
+    def get_block(self, ticker):
+        return self.blocks.get(ticker)
+
+    @timed('data.filter')
+    def get_emiten(self, ticker):
+        """
+        DataFrame emiten terurut tanggal (zero-copy). Jangan dimutasi in-place.
+        """
+        block = self.blocks.get(ticker)
+        return block.frame() if block is not None else pd.DataFrame()
+
+    def get_range(self, ticker, start=None, end=None):
+        """
+        Slice baris emiten dengan start <= date <= end via binary search.
+        """
+        block = self.blocks.get(ticker)
+        if block is None: return pd.DataFrame()
+        snap = block.snapshot()
+        lo = 0 if start is None else int(np.searchsorted(snap.dates, np.datetime64(pd.Timestamp(start)), side='left'))
+        return snap.frame().iloc[lo:snap.position(end)]
+
+    @timed('data.window')
+    def get_window(self, ticker, end_date=None, n=60):
+        """
+        View (n, 11) float32 fitur MODEL_FEATS yang berakhir di end_date.
+        Return None jika histori kurang dari n baris.
+        """
+        block = self.blocks.get(ticker)
+        if block is None: return None
+        snap = block.snapshot()
+        if snap.feats is None: return None
+        stop = snap.position(end_date)
+        if stop < n: return None
+        return snap.feats[stop - n:stop]
+
+    def last_date(self, ticker):
+        if ticker not in self.blocks: return None
+        dates = self.blocks[ticker].dates
+        return pd.Timestamp(dates[-1]) if len(dates) else None
@@ -0,0 +1,40 @@
+"""
+Tampilan diagnostik (tersembunyi, dibuka lewat Home.py?diagnostics=1):
+latency per tahap hot path dan hit rate cache dari utils.metrics.
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from utils.metrics import metrics, to_prometheus
+
+def render_diagnostics():
+    st.title("🩺 Diagnostics")
+    snap = metrics.snapshot()
+    st.caption(f"PID {snap['pid']} · uptime {snap['uptime_s'] / 60:.1f} menit · "
+               f"metrics {'aktif' if metrics.enabled else 'nonaktif (METRICS_ENABLED=0)'}")
+
+    st.subheader("Latency per Tahap (ms)")
+    if snap['stages']:
+        df_stages = pd.DataFrame.from_dict(snap['stages'], orient='index')
+        df_stages['total_ms'] = df_stages['mean_ms'] * df_stages['count']
+        st.dataframe(df_stages.sort_values('total_ms', ascending=False).round(3), use_container_width=True)
+    else:
+        st.info("Belum ada data. Jalankan forecast / buka chart dulu di sesi lain.")
+
+    st.subheader("Cache Hit Rate")
+    if snap['caches']:
+        st.dataframe(pd.DataFrame.from_dict(snap['caches'], orient='index').round(3), use_container_width=True)
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        if st.button("💾 Dump ke data/cache"):
+            st.success(f"Ditulis: {metrics.dump()}")
+    with c2:
+        st.download_button("JSON", json.dumps(snap, indent=2), file_name='metrics.json')
+    with c3:
+        st.download_button("Prometheus", to_prometheus(snap), file_name='metrics.prom')
+    if st.button("Reset"):
+        metrics.reset()
+        st.rerun()
@@ -0,0 +1,97 @@
+"""
+Downsampling chart teknikal agar payload Plotly tetap terbatas berapapun panjang range:
+  - candle/volume diagregasi ke OHLCV mingguan/bulanan/... jika bar harian > budget
+  - garis indikator (MA, MACD, RSI) didesimasi dengan LTTB (Largest-Triangle-Three-Buckets)
+    dari data harian, sehingga puncak/lembah tetap terlihat walau jumlah titik dibatasi
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# CHART_MAX_POINTS: budget titik per trace chart teknikal (0 = tanpa downsampling)
+CHART_MAX_POINTS = int(os.environ.get('CHART_MAX_POINTS', 500))
+
+# Level resample berurutan dari paling halus; 'D' = bar harian apa adanya
+RESAMPLE_LEVELS = ['D', 'W', 'M', 'Q', 'Y']
+LEVEL_LABELS = {'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly', 'Q': 'Quarterly', 'Y': 'Yearly'}
+
+# Agregasi OHLCV: Open=X1, High=X2, Low=X3, Close=Yt, Volume=X4
+OHLCV_AGG = {'date': 'last', 'X1': 'first', 'X2': 'max', 'X3': 'min', 'Yt': 'last', 'X4': 'sum'}
+
+# --- OHLCV RESAMPLING ---
+
+def period_count(dates, level):
+    if level == 'D': return len(dates)
+    return pd.Series(dates).dt.to_period(level).nunique()
+
+def choose_level(dates, max_points=CHART_MAX_POINTS):
+    """
+    Level resample paling halus yang jumlah barnya <= max_points.
+    """
+    if not max_points: return 'D'
+    for level in RESAMPLE_LEVELS:
+        if period_count(dates, level) <= max_points: return level
+    return RESAMPLE_LEVELS[-1]
+
+def resample_ohlcv(df, level):
+    """
+    Agregasi bar harian ke periode `level` (W/M/Q/Y). Tanggal bar = hari bursa terakhir
+    periode itu; kolom selain OHLCV mengambil nilai akhir periode (snapshot indikator).
+    """
+    if level == 'D' or df.empty: return df
+    agg = {c: OHLCV_AGG.get(c, 'last') for c in df.columns}
+    periods = df['date'].dt.to_period(level)
+    return df.groupby(periods.to_numpy(), sort=False).agg(agg).reset_index(drop=True)
+
+def adaptive_ohlcv(df, max_points=CHART_MAX_POINTS):
+    """
+    Return (frame_bar, level): df apa adanya jika muat di budget, jika tidak diresample.
+    """
+    level = choose_level(df['date'], max_points)
+    return resample_ohlcv(df, level), level
+
+# --- LINE DECIMATION (LTTB) ---
+
+def lttb_indices(x, y, n_out):
+    """
+    Index titik terpilih LTTB. Titik pertama & terakhir selalu ikut; tiap bucket
+    memilih titik dengan luas segitiga terbesar terhadap titik terpilih sebelumnya
+    dan rata-rata bucket berikutnya.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+    # Rata-rata tiap bucket (termasuk bucket terakhir = titik terakhir) dihitung sekali
+    bounds = np.append(edges, n)
+    sizes = np.diff(bounds)
+    avg_x = np.add.reduceat(x, edges) / sizes
+    avg_y = np.add.reduceat(y, edges) / sizes
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i + 1]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (avg_y[i + 1] - ay))
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def decimate_line(dates, values, max_points=CHART_MAX_POINTS):
+    """
+    Desimasi satu garis indikator (NaN dibuang dulu). Return (dates, values) numpy.
+    """
+    dates = np.asarray(dates)
+    values = np.asarray(values, dtype='float64')
+    valid = np.isfinite(values)
+    dates, values = dates[valid], values[valid]
+    if not max_points or len(values) <= max_points: return dates, values
+    idx = lttb_indices(dates.astype('datetime64[ns]').astype('int64'), values, max_points)
+    return dates[idx], values[idx]
@@ -0,0 +1,122 @@
+"""
+Atribusi fitur on-demand untuk window 60x11 yang sedang dipakai forecast, bukan
+ringkasan statis shap_values_summary.csv dari notebook offline.
+
+Nilai Shapley diestimasi dengan permutation sampling: fitur yang "tidak hadir" diganti
+background (rata-rata fitur itu di window), dan semua koalisi dari seluruh permutasi
+dikemas menjadi SATU batch inferensi per penjelasan.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import LRUCache
+from utils.data_loader import load_dataset_index, MODEL_FEATS, IDX_QUANT
+from utils.forecast import scale_windows, model_inputs
+from utils.forecast_cache import forecast_key
+from utils.model_loader import get_model_registry, run_inference
+from utils.metrics import metrics, timed
+
+# EXPLAIN_PERMUTATIONS: jumlah permutasi fitur (setengahnya dibalik/antithetic);
+# ukuran batch inferensi = permutasi x (jumlah fitur + 1)
+EXPLAIN_PERMUTATIONS = int(os.environ.get('EXPLAIN_PERMUTATIONS', 32))
+
+# Label sama dengan shap_values_summary.csv
+FEATURE_LABELS = {
+    'Yt': ('Close Price', 'Technical'), 'X1': ('Open Price', 'Technical'),
+    'X2': ('High Price', 'Technical'), 'X3': ('Low Price', 'Technical'),
+    'X4': ('Volume', 'Technical'), 'X5': ('MACD', 'Technical'), 'X6': ('RSI', 'Technical'),
+    'X7': ('Prob. Positif', 'Sentiment'), 'X8': ('Prob. Negatif', 'Sentiment'),
+    'X9': ('Freq. Positive', 'Sentiment'), 'X10': ('Freq. Negative', 'Sentiment'),
+}
+
+# Penjelasan per (emiten, scenario, tanggal terakhir, hash window, hash model)
+_explanations = LRUCache(maxsize=64)
+
+def scenario_features(scenario):
+    """
+    Index kolom MODEL_FEATS yang benar-benar masuk ke model skenario ini.
+    """
+    return list(IDX_QUANT) if scenario == 'baseline' else list(range(len(MODEL_FEATS)))
+
+# --- ESTIMATOR ---
+
+def coalition_masks(n_features, n_permutations, seed=0):
+    """
+    Mask koalisi (P, F+1, F): baris k = k fitur pertama permutasi p "hadir".
+    Setengah permutasi adalah kebalikan setengah lainnya untuk menekan varians.
+    Return (masks, perms).
+    """
+    rng = np.random.default_rng(seed)
+    half = max(1, n_permutations // 2)
+    perms = np.argsort(rng.random((half, n_features)), axis=1)
+    perms = np.concatenate([perms, perms[:, ::-1]])
+    ranks = np.argsort(perms, axis=1)  # ranks[p, f] = posisi fitur f di permutasi p
+    masks = ranks[:, None, :] < np.arange(n_features + 1)[None, :, None]
+    return masks, perms
+
+def shapley_values(predict, window, features, n_permutations=EXPLAIN_PERMUTATIONS, seed=0):
+    """
+    Shapley per fitur untuk satu window ter-scale (T, 11). predict: (N, T, 11) -> (N, H).
+    Kolom di luar `features` dibiarkan apa adanya. Return phi (F, H); per permutasi
+    sum(phi) = predict(window) - predict(background) persis (efficiency).
+    """
+    cols = np.asarray(features)
+    background = np.broadcast_to(window.mean(axis=0), window.shape)
+    masks, perms = coalition_masks(len(cols), n_permutations, seed)
+    n_perm, n_steps, _ = masks.shape
+
+    batch = np.broadcast_to(window, (n_perm, n_steps) + window.shape).copy()
+    batch[..., cols] = np.where(masks[:, :, None, :], window[:, cols], background[:, cols])
+    preds = np.asarray(predict(batch.reshape((-1,) + window.shape))).reshape(n_perm, n_steps, -1)
+
+    # Langkah k permutasi p menambahkan fitur perms[p, k]
+    deltas = np.diff(preds, axis=1)
+    phi = np.zeros((len(cols), preds.shape[-1]))
+    np.add.at(phi, perms, deltas)
+    return phi / n_perm
+
+# --- ENGINE ---
+
+@timed('explain.window')
+def explain_window(emiten, scenario, window_size=60, index=None, n_permutations=EXPLAIN_PERMUTATIONS):
+    """
+    Atribusi fitur untuk window terakhir emiten (input forecast saat ini), skema sama
+    dengan plot_interactive_shap: Feature, Feature Name, Category, Importance (|phi|
+    rata-rata H+1..H+3, skala output model), Rank, plus Contribution (phi bertanda).
+    Return None jika data/model tidak tersedia.
+    """
+    index = index if index is not None else load_dataset_index()
+    key = forecast_key(emiten, scenario, window_size, index)
+    if key is None: return None
+    cache_key = tuple(key.values()) + (n_permutations,)
+    cached, found = _explanations.get(cache_key)
+    metrics.hit('explain', found)
+    if found: return cached
+
+    registry = get_model_registry()
+    model, denorm = registry.get(emiten, scenario), registry.scalers.denormalizer(emiten)
+    if model is None or emiten not in denorm: return None
+    raw = index.get_window(emiten, n=window_size)
+    scaled = scale_windows(raw[None], denorm, [emiten])[0]
+
+    def predict(batch):
+        inputs = model_inputs(batch, scenario)
+        return run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+
+    features = scenario_features(scenario)
+    phi = shapley_values(predict, scaled, features, n_permutations)
+    importance = np.abs(phi).mean(axis=1)
+    order = np.argsort(-importance, kind='stable')
+    names = [MODEL_FEATS[features[i]] for i in order]
+    result = pd.DataFrame({
+        'Feature': names,
+        'Feature Name': [FEATURE_LABELS[f][0] for f in names],
+        'Category': [FEATURE_LABELS[f][1] for f in names],
+        'Importance': importance[order],
+        'Rank': np.arange(1, len(order) + 1),
+        'Contribution': phi.mean(axis=1)[order],
+    })
+    _explanations.put(cache_key, result)
+    return result
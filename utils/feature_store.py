@@ -0,0 +1,135 @@
+"""
+Matriks fitur numerik bersama (memory-mapped, read-only) untuk semua sesi & proses.
+Fitur MODEL_FEATS (harga OHLC, volume, MACD, RSI, sentimen) dan kolom indikator
+tambahan disimpan sebagai file .npy di data/cache; setiap proses me-mmap file yang
+sama sehingga halaman memori dishare lewat page cache OS, bukan disalin per proses.
+
+Build manual: python -m utils.feature_store
+"""
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+
+from utils.data_loader import MODEL_FEATS, DATASET_SOURCES, DATASET_CACHE_VERSION, INDICATOR_MODE
+
+# FEATURE_STORE: 'mmap' (default) atau 'off' (matriks fitur privat per proses seperti sebelumnya)
+FEATURE_STORE = os.environ.get('FEATURE_STORE', 'mmap')
+# Per INDICATOR_MODE, sama seperti cache Feather dataset (X5/X6 berbeda antar mode)
+FEATURE_STORE_DIR = os.path.join('data', 'cache', f'features_v{DATASET_CACHE_VERSION}_{INDICATOR_MODE}')
+EXTRA_COLS = ['macd_signal', 'macd_hist', 'ma20']
+
+logger = logging.getLogger(__name__)
+
+def source_signature(sources=DATASET_SOURCES):
+    sig = []
+    for path in sources:
+        try:
+            stat = os.stat(path)
+            sig.append([path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            sig.append([path, None, None])
+    return sig
+
+class FeatureStore:
+    """
+    feats (rows, 11) dan extra (rows, 3) float32 read-only, terurut (emiten, tanggal),
+    plus offsets[ticker] = (start, stop) per emiten.
+    """
+    def __init__(self, path, meta, feats, extra):
+        self.path = path
+        self.meta = meta
+        self.feats = feats
+        self.extra = extra
+        self.offsets = {t: tuple(o) for t, o in meta['offsets'].items()}
+
+    def __len__(self):
+        return len(self.feats)
+
+    @property
+    def nbytes(self):
+        return self.feats.nbytes + self.extra.nbytes
+
+    def is_fresh(self, sources=DATASET_SOURCES):
+        return self.meta.get('sources') == source_signature(sources)
+
+    def matches(self, tickers, starts, stops):
+        """
+        Cocokkan layout dengan frame yang akan di-index (jumlah baris & batas blok per emiten).
+        """
+        if sum(stop - start for start, stop in zip(starts, stops)) != len(self): return False
+        return all(self.offsets.get(t) == (int(a), int(b)) for t, a, b in zip(tickers, starts, stops))
+
+    def block(self, ticker):
+        start, stop = self.offsets[ticker]
+        return self.feats[start:stop], self.extra[start:stop]
+
+    @classmethod
+    def open(cls, path=FEATURE_STORE_DIR):
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            # np.asarray: view ndarray biasa di atas mmap (mmap tetap hidup lewat .base)
+            feats = np.asarray(np.load(os.path.join(path, 'feats.npy'), mmap_mode='r'))
+            extra = np.asarray(np.load(os.path.join(path, 'extra.npy'), mmap_mode='r'))
+        except (OSError, ValueError):
+            return None
+        return cls(path, meta, feats, extra)
+
+    @classmethod
+    def build(cls, df, path=FEATURE_STORE_DIR, sources=DATASET_SOURCES):
+        """
+        Tulis store dari frame load_dataset() (sorted issuer, date). Ditulis ke direktori
+        sementara lalu di-rename, jadi proses lain tidak pernah melihat store setengah jadi.
+        """
+        issuers = df['relevant_issuer'].astype(str).to_numpy()
+        cuts = np.flatnonzero(issuers[1:] != issuers[:-1]) + 1
+        starts = np.concatenate([[0], cuts]).astype(int)
+        stops = np.concatenate([cuts, [len(df)]]).astype(int)
+        meta = {
+            'version': DATASET_CACHE_VERSION,
+            'sources': source_signature(sources),
+            'columns': MODEL_FEATS,
+            'extra_columns': EXTRA_COLS,
+            'offsets': {issuers[a]: [int(a), int(b)] for a, b in zip(starts, stops)},
+        }
+        feats = df[MODEL_FEATS].to_numpy(dtype='float32')
+        extra = np.column_stack([
+            df[c].to_numpy(dtype='float32') if c in df.columns else np.full(len(df), np.nan, dtype='float32')
+            for c in EXTRA_COLS
+        ])
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'feats.npy'), np.ascontiguousarray(feats))
+        np.save(os.path.join(tmp_path, 'extra.npy'), np.ascontiguousarray(extra))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        # Ganti direktori lama; pembaca yang sudah mmap tetap memegang inode lama
+        old_path = f"{path}.{os.getpid()}.old"
+        if os.path.exists(path): os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return cls.open(path)
+
+def get_feature_store(df, path=FEATURE_STORE_DIR):
+    """
+    Store yang cocok dengan frame df: pakai yang ada di disk jika masih fresh,
+    jika tidak dibangun ulang. Return None jika FEATURE_STORE='off' atau gagal.
+    """
+    if FEATURE_STORE == 'off' or df.empty: return None
+    store = FeatureStore.open(path)
+    if store is not None and store.is_fresh() and len(store) == len(df): return store
+    try:
+        return FeatureStore.build(df, path)
+    except (OSError, KeyError) as e:
+        logger.warning("Gagal membangun feature store %s: %s", path, e)
+        return None
+
+if __name__ == '__main__':
+    from utils.data_loader import load_dataset
+    store = get_feature_store(load_dataset())
+    print(f"Feature store: {store.path} | {len(store):,} baris | {store.nbytes / 1e6:.2f} MB")
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import (
+    load_dataset_index,
+    EMITENS,
+    SCENARIOS,
+    MODEL_FEATS,
+    IDX_QUANT,
+    IDX_QUAL
+)
+from utils.model_loader import get_model_registry, run_inference
+
+HORIZON = 3
+
+# --- WINDOWING ---
+
+def build_windows(df, emitens=EMITENS, window_size=60):
+    """
+    Ambil window 60 hari terakhir untuk semua emiten sekaligus.
+    df harus sudah terurut (relevant_issuer, date) seperti output load_dataset().
+    Return (emitens_valid, windows (E, window, 11), last_dates, last_prices).
+    """
+    issuers = df['relevant_issuer'].to_numpy()
+    feats = df[MODEL_FEATS].to_numpy(dtype='float32')
+
+    # Posisi akhir (eksklusif) blok tiap emiten di frame yang sudah sorted
+    starts = np.searchsorted(issuers, emitens, side='left')
+    ends = np.searchsorted(issuers, emitens, side='right')
+    valid = (ends - starts) >= window_size
+    emitens_valid = [e for e, ok in zip(emitens, valid) if ok]
+    ends = ends[valid]
+
+    # Fancy-index (E, window) -> satu gather untuk semua emiten
+    idx = ends[:, None] - window_size + np.arange(window_size)[None, :]
+    windows = feats[idx]
+    last_dates = df['date'].to_numpy()[ends - 1]
+    return emitens_valid, windows, last_dates, feats[ends - 1, 0]
+
+def index_windows(index, emitens=EMITENS, window_size=60):
+    """
+    Sama dengan build_windows, tapi dari DatasetIndex (view blok per emiten), sehingga
+    baris hasil append_trading_days ikut terpakai tanpa menunggu load_dataset() dibangun ulang.
+    """
+    emitens_valid, windows = [], []
+    for emiten in emitens:
+        window = index.get_window(emiten, n=window_size)
+        if window is None: continue
+        emitens_valid.append(emiten)
+        windows.append(window)
+    if not windows:
+        return [], np.empty((0, window_size, len(MODEL_FEATS)), dtype='float32'), np.array([], dtype='datetime64[ns]'), np.array([], dtype='float32')
+    windows = np.stack(windows)
+    last_dates = np.array([index.last_date(e) for e in emitens_valid], dtype='datetime64[ns]')
+    return emitens_valid, windows, last_dates, windows[:, -1, 0]
+
+def scale_windows(windows, denorm, emitens):
+    """
+    Terapkan MinMaxScaler per emiten ke tensor (E, window, 11) secara vectorized.
+    """
+    return denorm.transform(windows, emitens)
+
+def model_inputs(scaled, scenario):
+    """
+    Pecah window ter-scale menjadi input model: baseline -> [quant], fusion -> [quant, qual].
+    """
+    if scenario == 'baseline':
+        return [scaled[..., IDX_QUANT]]
+    return [scaled[..., IDX_QUANT], scaled[..., IDX_QUAL]]
+
+# --- ENGINE ---
+
+def forecast_all(emitens=EMITENS, scenarios=SCENARIOS, window_size=60, df=None, index=None):
+    """
+    Prediksi H+1..H+3 untuk semua emiten x skenario dalam satu eksekusi.
+    Semua model digabung menjadi satu graph (lihat ModelRegistry.get_group),
+    jadi hanya ada satu call inferensi untuk seluruh pasar.
+    Window diambil dari `df` jika diberikan, selain itu dari DatasetIndex (default
+    load_dataset_index(), sumber yang sama dengan forecast_key).
+    Return DataFrame tidy: emiten, scenario, horizon, date, price, last_date, last_price.
+    """
+    if df is not None:
+        if df.empty: return pd.DataFrame()
+        emitens_valid, windows, last_dates, last_prices = build_windows(df, list(emitens), window_size)
+    else:
+        index = index if index is not None else load_dataset_index()
+        emitens_valid, windows, last_dates, last_prices = index_windows(index, list(emitens), window_size)
+    if not emitens_valid: return pd.DataFrame()
+    registry = get_model_registry()
+    denorm = registry.scalers.denormalizer(emitens_valid)
+    keep = [i for i, e in enumerate(emitens_valid) if e in denorm]
+    if not keep: return pd.DataFrame()
+    emitens_valid = [emitens_valid[i] for i in keep]
+    scaled = scale_windows(windows[keep], denorm, emitens_valid)
+
+    keys = [(e, sc) for e in emitens_valid for sc in scenarios]
+    grouped = registry.get_group(keys)
+    if grouped is None: return pd.DataFrame()
+
+    inputs = []
+    for i, _ in enumerate(emitens_valid):
+        for sc in scenarios:
+            inputs.extend(model_inputs(scaled[i:i + 1], sc))
+    outputs = grouped.predict_on_batch(inputs)
+    if not isinstance(outputs, (list, tuple)): outputs = [outputs]
+    preds_sc = np.concatenate([np.asarray(o).reshape(1, -1) for o in outputs])  # (E*S, 3)
+
+    # Inverse kolom Yt saja, tensor (E, S, 3) sekali jalan
+    prices = denorm.inverse_price(preds_sc.reshape(len(emitens_valid), len(scenarios), -1), emitens_valid)
+    prices = prices.reshape(len(keys), -1)
+
+    n_keys, horizon = prices.shape
+    key_idx = np.repeat(np.arange(n_keys), horizon)
+    h = np.tile(np.arange(1, horizon + 1), n_keys)
+    emiten_idx = key_idx // len(scenarios)
+    last_d = pd.to_datetime(last_dates[keep][emiten_idx])
+    return pd.DataFrame({
+        'emiten': np.array(emitens_valid)[emiten_idx],
+        'scenario': np.array(scenarios)[key_idx % len(scenarios)],
+        'horizon': h,
+        'date': last_d + pd.to_timedelta(h, unit='D'),
+        'price': prices.ravel(),
+        'last_date': last_d,
+        'last_price': last_prices[keep][emiten_idx],
+    })
+
+def predict_emiten(emiten, scenario, window_size=60, index=None):
+    """
+    Jalur satu emiten: window terakhir -> scaler -> inferensi -> harga H+1..H+3 (Rupiah).
+    Return None jika data/model tidak tersedia.
+    """
+    index = index if index is not None else load_dataset_index()
+    raw = index.get_window(emiten, n=window_size)
+    registry = get_model_registry()
+    model, denorm = registry.get(emiten, scenario), registry.scalers.denormalizer(emiten)
+    if raw is None or model is None or emiten not in denorm: return None
+
+    scaled = scale_windows(raw[None], denorm, [emiten])
+    inputs = model_inputs(scaled, scenario)
+    pred_sc = run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)[0]
+    return denorm.inverse_price(pred_sc, emiten)
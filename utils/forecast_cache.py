@@ -0,0 +1,187 @@
+"""
+Cache hasil forecast H+1..H+3 per (emiten, tanggal data terakhir, skenario, hash model,
+scaler aktif, backend inferensi).
+Disimpan di memori dan di disk (bertahan saat proses restart). Satu file per
+(emiten, skenario): versi data/model yang lebih baru otomatis menggantikan yang lama.
+
+Precompute semua emiten: python -m utils.forecast_cache
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import load_dataset_index, EMITENS, SCENARIOS
+from utils.model_loader import model_path_for, get_model_registry, INFERENCE_BACKEND
+from utils.forecast import forecast_all, predict_emiten
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CACHE_DIR = os.path.join('data', 'cache', 'forecasts')
+
+# --- FINGERPRINTS ---
+
+_file_hashes = {}  # path -> ((mtime, size), sha1)
+
+def file_hash(path):
+    """
+    SHA1 isi file, di-cache per (mtime, size) supaya tidak dibaca ulang setiap request.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    sig = (stat.st_mtime, stat.st_size)
+    cached = _file_hashes.get(path)
+    if cached is not None and cached[0] == sig: return cached[1]
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    _file_hashes[path] = (sig, h.hexdigest())
+    return _file_hashes[path][1]
+
+def scaler_fingerprint(emiten):
+    """
+    Hash parameter scaler yang benar-benar dipakai (pickle atau hasil refit SCALER_MODE),
+    bukan file .pkl: scaler refit bisa berubah setelah ingest tanpa file apa pun berubah.
+    """
+    store = get_model_registry().scalers
+    scaler = store.get(emiten)
+    if scaler is None: return ''
+    h = hashlib.sha1(str(store.source(emiten)).encode())
+    for attr in ('scale_', 'min_'):
+        h.update(np.ascontiguousarray(getattr(scaler, attr), dtype='float64').tobytes())
+    return h.hexdigest()[:16]
+
+def model_fingerprint(emiten, scenario):
+    """
+    Hash model .h5 + scaler aktif (keduanya menentukan output forecast).
+    """
+    parts = [file_hash(model_path_for(emiten, scenario)) or '', scaler_fingerprint(emiten)]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+def forecast_key(emiten, scenario, window_size=60, index=None):
+    """
+    Kunci cache: tanggal data terakhir + hash isi window (menangkap koreksi data
+    pada tanggal yang sama, mis. sentimen susulan) + hash model/scaler + backend
+    inferensi (output tflite tidak identik dengan keras).
+    """
+    index = index if index is not None else load_dataset_index()
+    window = index.get_window(emiten, n=window_size)
+    if window is None: return None
+    return {
+        'emiten': emiten,
+        'scenario': scenario,
+        'last_date': index.last_date(emiten).strftime('%Y-%m-%d'),
+        'data_hash': hashlib.sha1(np.ascontiguousarray(window).tobytes()).hexdigest()[:16],
+        'model_hash': model_fingerprint(emiten, scenario),
+        'backend': INFERENCE_BACKEND,
+    }
+
+# --- CACHE ---
+
+class ForecastCache:
+    def __init__(self, cache_dir=FORECAST_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries = {}  # (emiten, scenario) -> {'key': ..., 'prices': [...]}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, emiten, scenario):
+        return os.path.join(self.cache_dir, f'{scenario}_{emiten}.json')
+
+    def _read_disk(self, emiten, scenario):
+        try:
+            with open(self._path(emiten, scenario)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key):
+        slot = (key['emiten'], key['scenario'])
+        entry = self._entries.get(slot)
+        if entry is None:
+            entry = self._read_disk(*slot)
+            if entry is not None: self._entries[slot] = entry
+        if entry is not None and entry.get('key') == key:
+            self.hits += 1
+            metrics.hit('forecast_cache', True)
+            return np.asarray(entry['prices'], dtype='float64')
+        self.misses += 1
+        metrics.hit('forecast_cache', False)
+        return None
+
+    def put(self, key, prices):
+        slot = (key['emiten'], key['scenario'])
+        entry = {'key': key, 'prices': [float(p) for p in prices]}
+        with self._lock:
+            self._entries[slot] = entry
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{self._path(*slot)}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, self._path(*slot))
+            except OSError as e:
+                logger.warning("Gagal menyimpan forecast cache %s: %s", slot, e)
+
+    def evict(self, emiten=None, scenario=None):
+        with self._lock:
+            for e in EMITENS if emiten is None else [emiten]:
+                for sc in SCENARIOS if scenario is None else [scenario]:
+                    self._entries.pop((e, sc), None)
+                    try: os.remove(self._path(e, sc))
+                    except OSError: pass
+
+    def get_or_compute(self, emiten, scenario, window_size=60, index=None):
+        """
+        Harga H+1..H+3 dari cache; jika miss (data/model berubah) dihitung lalu disimpan.
+        """
+        key = forecast_key(emiten, scenario, window_size, index)
+        if key is None: return None
+        prices = self.get(key)
+        if prices is None:
+            prices = predict_emiten(emiten, scenario, window_size, index)
+            if prices is not None: self.put(key, prices)
+        return prices
+
+_cache = None
+
+def get_forecast_cache():
+    global _cache
+    if _cache is None: _cache = ForecastCache()
+    return _cache
+
+def cached_forecast(emiten, scenario, window_size=60, index=None):
+    return get_forecast_cache().get_or_compute(emiten, scenario, window_size, index)
+
+def precompute_forecasts(emitens=EMITENS, scenarios=SCENARIOS, window_size=60):
+    """
+    Isi cache untuk semua emiten x skenario dengan satu call forecast_all().
+    Return jumlah entry yang ditulis.
+    """
+    index = load_dataset_index()
+    cache = get_forecast_cache()
+    keys = {(e, sc): forecast_key(e, sc, window_size, index) for e in emitens for sc in scenarios}
+    stale = [k for k, key in keys.items() if key is not None and cache.get(key) is None]
+    if not stale: return 0
+
+    todo = sorted({e for e, _ in stale}, key=list(emitens).index)
+    # Window dari index yang sama dengan keys (bukan frame load_dataset() yang bisa basi)
+    df = forecast_all(todo, list(scenarios), window_size, index=index)
+    written = 0
+    for (emiten, scenario), group in df.groupby(['emiten', 'scenario'], sort=False):
+        if (emiten, scenario) in stale:
+            cache.put(keys[(emiten, scenario)], group.sort_values('horizon')['price'].to_numpy())
+            written += 1
+    return written
+
+if __name__ == '__main__':
+    print(f"Forecast ditulis: {precompute_forecasts()}")
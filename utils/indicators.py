@@ -0,0 +1,219 @@
+import numpy as np
+from scipy.signal import lfilter
+
+# Parameter indikator (sama dengan notebook offline yang menghasilkan df_numerik_final.csv)
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+MA_WINDOW = 20
+
+INDICATOR_COLS = ['macd', 'macd_signal', 'macd_hist', 'rsi', 'ma20']
+
+def span_to_alpha(span):
+    return 2.0 / (span + 1.0)
+
+# --- VECTORIZED (BATCH) ---
+
+def group_bounds(groups):
+    """
+    Batas blok (start, stop) untuk array label yang sudah terurut per grup.
+    """
+    groups = np.asarray(groups)
+    if len(groups) == 0: return np.array([], dtype=int), np.array([], dtype=int)
+    cuts = np.flatnonzero(groups[1:] != groups[:-1]) + 1
+    return np.concatenate([[0], cuts]), np.concatenate([cuts, [len(groups)]])
+
+def to_padded(values, starts, stops):
+    """
+    Susun seri per grup menjadi matriks (G, T_max), rata kiri; sisa kanan diisi nilai terakhir.
+    """
+    lengths = stops - starts
+    t_max = int(lengths.max()) if len(lengths) else 0
+    cols = np.arange(t_max)
+    idx = starts[:, None] + np.minimum(cols[None, :], lengths[:, None] - 1)
+    return values[idx], cols[None, :] < lengths[:, None]
+
+def from_padded(matrix, mask):
+    return matrix[mask]
+
+def ema(matrix, alpha):
+    """
+    EMA adjust=False (y0 = x0) sepanjang sumbu waktu untuk semua baris sekaligus.
+    """
+    matrix = np.asarray(matrix, dtype='float64')
+    if matrix.shape[-1] == 0: return matrix.copy()
+    zi = (1.0 - alpha) * matrix[..., :1]
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], matrix, axis=-1, zi=zi)
+    return out
+
+def rolling_mean(matrix, window):
+    """
+    Rata-rata bergulir via cumsum (NaN untuk window-1 titik pertama).
+    """
+    csum = np.cumsum(matrix, axis=-1)
+    out = np.full(matrix.shape, np.nan)
+    out[..., window - 1] = csum[..., window - 1]
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    out[..., window - 1:] /= window
+    return out
+
+def compute_indicators(close, groups):
+    """
+    MACD, signal, histogram, RSI (Wilder) dan MA20 untuk semua emiten sekaligus.
+    close & groups harus terurut (grup, tanggal). Return (dict kolom -> array sejajar close,
+    list IndicatorState terakhir per grup) -> state dipakai untuk update inkremental.
+    """
+    close = np.asarray(close, dtype='float64')
+    starts, stops = group_bounds(groups)
+    if len(starts) == 0:
+        return {col: np.array([]) for col in INDICATOR_COLS}, []
+    x, mask = to_padded(close, starts, stops)
+
+    ema_fast = ema(x, span_to_alpha(MACD_FAST))
+    ema_slow = ema(x, span_to_alpha(MACD_SLOW))
+    macd = ema_fast - ema_slow
+    signal = ema(macd, span_to_alpha(MACD_SIGNAL))
+
+    # RSI: smoothing Wilder (alpha = 1/n) dimulai dari delta pertama
+    delta = np.diff(x, axis=1)
+    avg_gain = ema(np.clip(delta, 0, None), 1.0 / RSI_PERIOD)
+    avg_loss = ema(np.clip(-delta, 0, None), 1.0 / RSI_PERIOD)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Tanpa penurunan (termasuk harga datar) RSI = 100, sama dengan IndicatorState/IndicatorBatch
+        rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    rsi = np.concatenate([np.full((len(x), 1), np.nan), rsi], axis=1)
+
+    ma = rolling_mean(x, MA_WINDOW) if x.shape[1] >= MA_WINDOW else np.full(x.shape, np.nan)
+
+    out = {
+        'macd': from_padded(macd, mask),
+        'macd_signal': from_padded(signal, mask),
+        'macd_hist': from_padded(macd - signal, mask),
+        'rsi': from_padded(rsi, mask),
+        'ma20': from_padded(ma, mask),
+    }
+
+    states = []
+    for g, (start, stop) in enumerate(zip(starts, stops)):
+        last = stop - start - 1
+        states.append(IndicatorState(
+            ema_fast=ema_fast[g, last], ema_slow=ema_slow[g, last], signal=signal[g, last],
+            avg_gain=avg_gain[g, last - 1] if last > 0 else np.nan,
+            avg_loss=avg_loss[g, last - 1] if last > 0 else np.nan,
+            last_close=close[stop - 1], recent=close[max(start, stop - MA_WINDOW):stop]
+        ))
+    return out, states
+
+# --- INCREMENTAL ---
+
+class IndicatorState:
+    """
+    State minimal untuk melanjutkan indikator satu emiten bar demi bar (O(1) per bar).
+    """
+    def __init__(self, ema_fast, ema_slow, signal, avg_gain, avg_loss, last_close, recent):
+        self.ema_fast = float(ema_fast)
+        self.ema_slow = float(ema_slow)
+        self.signal = float(signal)
+        self.avg_gain = float(avg_gain)
+        self.avg_loss = float(avg_loss)
+        self.last_close = float(last_close)
+        # Ring buffer MA_WINDOW close terakhir + jumlahnya
+        self.recent = np.zeros(MA_WINDOW)
+        self.count = min(len(recent), MA_WINDOW)
+        self.recent[:self.count] = np.asarray(recent, dtype='float64')[-self.count:] if self.count else []
+        self.pos = self.count % MA_WINDOW
+        self.total = float(self.recent[:self.count].sum())
+
+    def copy(self):
+        clone = IndicatorState.__new__(IndicatorState)
+        clone.__dict__.update(self.__dict__)
+        clone.recent = self.recent.copy()
+        return clone
+
+def init_state(close_history):
+    """
+    Bangun state dari histori close satu emiten (sekali, O(n)).
+    """
+    close_history = np.asarray(close_history, dtype='float64')
+    _, states = compute_indicators(close_history, np.zeros(len(close_history), dtype=int))
+    return states[0]
+
+def update(state, new_bar):
+    """
+    Lanjutkan indikator dengan satu bar baru (close, atau dict dengan 'Close'/'Yt').
+    State dimutasi in place; return dict nilai indikator untuk bar tersebut.
+    """
+    if isinstance(new_bar, dict):
+        close = float(new_bar.get('Close', new_bar.get('Yt')))
+    else:
+        close = float(new_bar)
+
+    a_fast, a_slow, a_sig = span_to_alpha(MACD_FAST), span_to_alpha(MACD_SLOW), span_to_alpha(MACD_SIGNAL)
+    state.ema_fast += a_fast * (close - state.ema_fast)
+    state.ema_slow += a_slow * (close - state.ema_slow)
+    macd = state.ema_fast - state.ema_slow
+    state.signal += a_sig * (macd - state.signal)
+
+    delta = close - state.last_close
+    gain, loss = max(delta, 0.0), max(-delta, 0.0)
+    if np.isnan(state.avg_gain):
+        state.avg_gain, state.avg_loss = gain, loss
+    else:
+        state.avg_gain += (gain - state.avg_gain) / RSI_PERIOD
+        state.avg_loss += (loss - state.avg_loss) / RSI_PERIOD
+    rsi = 100.0 - 100.0 / (1.0 + state.avg_gain / state.avg_loss) if state.avg_loss > 0 else 100.0
+    state.last_close = close
+
+    if state.count == MA_WINDOW: state.total -= state.recent[state.pos]
+    else: state.count += 1
+    state.recent[state.pos] = close
+    state.total += close
+    state.pos = (state.pos + 1) % MA_WINDOW
+    ma = state.total / MA_WINDOW if state.count == MA_WINDOW else np.nan
+
+    return {'macd': macd, 'macd_signal': state.signal, 'macd_hist': macd - state.signal, 'rsi': rsi, 'ma20': ma}
+
+# --- INCREMENTAL (BATCH) ---
+
+class IndicatorBatch:
+    """
+    Kumpulan IndicatorState banyak emiten sebagai array (E,): satu update vectorized
+    per bar untuk semua emiten sekaligus (dipakai forecast rekursif).
+    """
+    def __init__(self, states):
+        for name in ('ema_fast', 'ema_slow', 'signal', 'avg_gain', 'avg_loss', 'last_close', 'total'):
+            setattr(self, name, np.array([getattr(s, name) for s in states], dtype='float64'))
+        self.pos = np.array([s.pos for s in states], dtype=int)
+        self.count = np.array([s.count for s in states], dtype=int)
+        self.recent = np.stack([s.recent for s in states]) if states else np.zeros((0, MA_WINDOW))
+
+    def update(self, close):
+        """
+        close (E,) -> dict kolom indikator -> array (E,). State dimutasi in place.
+        """
+        close = np.asarray(close, dtype='float64')
+        self.ema_fast += span_to_alpha(MACD_FAST) * (close - self.ema_fast)
+        self.ema_slow += span_to_alpha(MACD_SLOW) * (close - self.ema_slow)
+        macd = self.ema_fast - self.ema_slow
+        self.signal += span_to_alpha(MACD_SIGNAL) * (macd - self.signal)
+
+        delta = close - self.last_close
+        gain, loss = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+        fresh = np.isnan(self.avg_gain)
+        self.avg_gain = np.where(fresh, gain, self.avg_gain + (gain - self.avg_gain) / RSI_PERIOD)
+        self.avg_loss = np.where(fresh, loss, self.avg_loss + (loss - self.avg_loss) / RSI_PERIOD)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(self.avg_loss > 0, 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss), 100.0)
+        self.last_close = close
+
+        rows = np.arange(len(close))
+        full = self.count == MA_WINDOW
+        self.total -= np.where(full, self.recent[rows, self.pos], 0.0)
+        self.count = np.minimum(self.count + 1, MA_WINDOW)
+        self.recent[rows, self.pos] = close
+        self.total += close
+        self.pos = (self.pos + 1) % MA_WINDOW
+        ma = np.where(self.count == MA_WINDOW, self.total / MA_WINDOW, np.nan)
+
+        return {'macd': macd, 'macd_signal': self.signal, 'macd_hist': macd - self.signal, 'rsi': rsi, 'ma20': ma}
@@ -0,0 +1,127 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.indicators import init_state, update, INDICATOR_COLS
+from utils.data_loader import (
+    load_dataset,
+    load_dataset_index,
+    DATASET_SOURCES,
+    MODEL_FEATS,
+    RENAME_MAP,
+    SENTIMENT_COLS
+)
+from utils.model_loader import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLS = ['date', 'Close', 'Open', 'High', 'Low', 'Volume', 'macd', 'macd_signal', 'macd_hist', 'rsi', 'relevant_issuer']
+SENTIMENT_FILE_COLS = ['date', 'relevant_issuer'] + SENTIMENT_COLS
+
+# --- DERIVED COLUMNS ---
+
+def tail_indicators(block, close_new):
+    """
+    MACD/signal/hist, RSI dan MA20 untuk baris baru saja. State indikator emiten
+    dibangun sekali dari histori blok, setelah itu setiap bar baru O(1).
+    """
+    state = getattr(block, 'indicator_state', None)
+    if state is None:
+        state = init_state(block.columns['Yt'])
+    rows = [update(state, close) for close in close_new]
+    block.indicator_state = state
+    return {col: np.array([r[col] for r in rows], dtype='float64') for col in INDICATOR_COLS}
+
+def _normalise(df):
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df['relevant_issuer'] = df['relevant_issuer'].astype(str).str.strip()
+    return df
+
+# --- INGESTION ---
+
+def append_trading_days(prices, sentiment=None, index=None, persist=True):
+    """
+    Tambahkan hari perdagangan baru untuk satu/lebih emiten secara inkremental.
+
+    prices    : DataFrame skema df_numerik_final.csv (date, relevant_issuer, Close, Open, High,
+                Low, Volume; macd/rsi opsional -> dilanjutkan dari state indikator jika kosong).
+    sentiment : DataFrame skema df_sentiment_features_daily.csv (opsional). Baris untuk tanggal
+                yang sudah ada di index menimpa X7-X10 di tempat (sentimen terlambat).
+
+    Index per emiten di-update in place (O(baris baru)); jika persist, baris mentah di-append
+    ke CSV sumber dan cache load_dataset() dibuang agar dibangun ulang saat dibutuhkan.
+    Halaman Streamlit dan jalur forecast (forecast_all, precompute_forecasts) hanya membaca
+    index, jadi rerun setelah ingest tidak mem-parse ulang CSV; frame load_dataset() hanya
+    dibangun ulang jika ada pemanggil eksplisit (mis. build feature store / benchmark).
+    Return DataFrame ringkasan per emiten.
+    """
+    index = index if index is not None else load_dataset_index()
+    prices = _normalise(prices) if prices is not None and len(prices) else pd.DataFrame(columns=NUMERIC_COLS)
+    sentiment = _normalise(sentiment) if sentiment is not None and len(sentiment) else pd.DataFrame(columns=SENTIMENT_FILE_COLS)
+    sentiment = sentiment.drop_duplicates(['date', 'relevant_issuer'], keep='last')
+
+    summary, new_numeric = [], []
+    for ticker in sorted(set(prices['relevant_issuer']) | set(sentiment['relevant_issuer'])):
+        block = index.get_block(ticker)
+        if block is None:
+            logger.warning("Emiten %s belum ada di index; emiten baru butuh rebuild penuh", ticker)
+            continue
+        last_date = block.dates[-1] if len(block) else None
+        rows = prices[prices['relevant_issuer'] == ticker].sort_values('date').drop_duplicates('date', keep='last')
+        if last_date is not None:
+            rows = rows[rows['date'].to_numpy() > last_date]
+        sen = sentiment[sentiment['relevant_issuer'] == ticker]
+
+        # 1. Sentimen terlambat untuk tanggal yang sudah ada -> update di tempat
+        late = sen[sen['date'].to_numpy() <= last_date] if last_date is not None else sen.iloc[:0]
+        positions = np.searchsorted(block.dates, late['date'].to_numpy())
+        found = (positions < len(block)) & (block.dates[np.minimum(positions, len(block) - 1)] == late['date'].to_numpy())
+        if found.any():
+            block.update(positions[found], {c: late[c].to_numpy(dtype='float64')[found] for c in SENTIMENT_COLS}, MODEL_FEATS)
+
+        # 2. Baris harga baru: merge sentimen, fillna, indikator tail
+        if len(rows):
+            rows = rows.merge(sen[['date'] + SENTIMENT_COLS], on='date', how='left')
+            rows[SENTIMENT_COLS] = rows[SENTIMENT_COLS].fillna(0)
+            derived = tail_indicators(block, rows['Close'].to_numpy(dtype='float64'))
+            for col, values in derived.items():
+                if col not in rows.columns: rows[col] = values
+                else: rows[col] = rows[col].fillna(pd.Series(values, index=rows.index))
+            new_numeric.append(rows[[c for c in NUMERIC_COLS]])
+
+            model_rows = rows.rename(columns=RENAME_MAP)
+            block.append({col: model_rows[col].to_numpy() for col in model_rows.columns if col in block.columns}, MODEL_FEATS)
+
+        summary.append({'emiten': ticker, 'appended': len(rows), 'sentiment_updates': int(found.sum()),
+                        'last_date': pd.Timestamp(block.dates[-1])})
+
+    if persist:
+        _persist(new_numeric, sentiment)
+    _invalidate_caches([s['emiten'] for s in summary if s['appended'] or s['sentiment_updates']])
+    return pd.DataFrame(summary)
+
+def _persist(new_numeric, sentiment, sources=DATASET_SOURCES):
+    """
+    Append baris mentah ke CSV sumber (mode 'a', O(baris baru)).
+    """
+    path_num, path_sen = sources
+    if new_numeric:
+        df_new = pd.concat(new_numeric, ignore_index=True)
+        df_new['date'] = df_new['date'].dt.strftime('%Y-%m-%d')
+        df_new.to_csv(path_num, mode='a', header=not os.path.exists(path_num), index=False)
+    if len(sentiment):
+        df_sen = sentiment[SENTIMENT_FILE_COLS].copy()
+        df_sen['date'] = df_sen['date'].dt.strftime('%Y-%m-%d')
+        df_sen.to_csv(path_sen, mode='a', header=not os.path.exists(path_sen), index=False)
+    # Frame datar lama sudah basi; index tetap dipakai apa adanya (sudah ter-update)
+    load_dataset.clear()
+
+def _invalidate_caches(emitens):
+    scalers = get_model_registry().scalers
+    for emiten in emitens:
+        # Scaler .pkl dari training tidak berubah; hanya hasil refit yang perlu di-fit ulang
+        if scalers.source(emiten) == 'refit':
+            scalers.invalidate(emiten)
@@ -0,0 +1,154 @@
+"""
+Instrumentasi hot path: timer per tahap (count, total, p50/p95/p99) dan hit rate cache.
+Murni stdlib + numpy, aman dipakai dari thread worker. Snapshot ditulis berkala oleh
+thread latar ke data/cache/metrics.json dan metrics.prom (format teks Prometheus),
+jadi thread request/inferensi tidak pernah menunggu I/O disk.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# METRICS_ENABLED     : '0' mematikan semua pencatatan (overhead nol)
+# METRICS_DUMP_SECONDS: interval dump otomatis ke disk oleh thread latar (0 = tidak pernah)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+METRICS_DUMP_SECONDS = float(os.environ.get('METRICS_DUMP_SECONDS', 30))
+METRICS_DIR = os.path.join('data', 'cache')
+# Jumlah sampel terakhir per tahap yang dipakai untuk persentil
+RESERVOIR_SIZE = 2048
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=RESERVOIR_SIZE)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples.append(ms)
+
+    def summary(self):
+        p50, p95, p99 = np.percentile(self.samples, [50, 95, 99]) if self.samples else (0.0, 0.0, 0.0)
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'max_ms': self.max_ms,
+        }
+
+class Metrics:
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.started = time.time()
+        self._stages = {}  # stage -> StageStats
+        self._hits = {}  # cache -> [hits, misses]
+        self._lock = threading.Lock()
+        self._dumper = None  # thread dump berkala, dimulai saat observasi pertama
+
+    def observe(self, stage, ms):
+        if not self.enabled: return
+        with self._lock:
+            self._stages.setdefault(stage, StageStats()).add(ms)
+            if self._dumper is None and METRICS_DUMP_SECONDS > 0: self._start_dumper()
+
+    def hit(self, cache, is_hit):
+        if not self.enabled: return
+        with self._lock:
+            counts = self._hits.setdefault(cache, [0, 0])
+            counts[0 if is_hit else 1] += 1
+
+    @contextmanager
+    def timer(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - t0) * 1000)
+
+    def timed(self, stage):
+        """
+        Decorator: catat durasi setiap pemanggilan fungsi ke `stage`.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled: return fn(*args, **kwargs)
+                with self.timer(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: s.summary() for name, s in sorted(self._stages.items())}
+            caches = {
+                name: {'hits': h, 'misses': m, 'hit_rate': h / (h + m) if h + m else 0.0}
+                for name, (h, m) in sorted(self._hits.items())
+            }
+        return {'uptime_s': time.time() - self.started, 'pid': os.getpid(), 'stages': stages, 'caches': caches}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._hits.clear()
+
+    def _start_dumper(self):
+        # Dipanggil dengan self._lock dipegang: paling banyak satu thread dumper per proses
+        self._dumper = threading.Thread(target=self._dump_loop, daemon=True, name='metrics-dump')
+        self._dumper.start()
+
+    def _dump_loop(self):
+        while True:
+            time.sleep(METRICS_DUMP_SECONDS)
+            try:
+                self.dump()
+            except OSError:
+                pass
+
+    def dump(self, out_dir=METRICS_DIR):
+        """
+        Tulis snapshot ke metrics.json dan metrics.prom (atomic rename). Return path JSON.
+        """
+        snap = self.snapshot()
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {'metrics.json': json.dumps(snap, indent=2), 'metrics.prom': to_prometheus(snap)}
+        for name, text in paths.items():
+            path = os.path.join(out_dir, name)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # dump manual & latar bisa bersamaan
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return os.path.join(out_dir, 'metrics.json')
+
+def to_prometheus(snap):
+    """
+    Snapshot -> teks eksposisi Prometheus (summary per tahap + counter cache).
+    """
+    lines = [
+        '# HELP stock_stage_latency_ms Latency per tahap hot path (ms).',
+        '# TYPE stock_stage_latency_ms summary',
+    ]
+    for stage, s in snap['stages'].items():
+        for q, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+            lines.append(f'stock_stage_latency_ms{{stage="{stage}",quantile="{q}"}} {s[key]:.6f}')
+        lines.append(f'stock_stage_latency_ms_sum{{stage="{stage}"}} {s["mean_ms"] * s["count"]:.6f}')
+        lines.append(f'stock_stage_latency_ms_count{{stage="{stage}"}} {s["count"]}')
+    lines += ['# HELP stock_cache_requests_total Lookup cache per hasil.', '# TYPE stock_cache_requests_total counter']
+    for cache, c in snap['caches'].items():
+        lines.append(f'stock_cache_requests_total{{cache="{cache}",result="hit"}} {c["hits"]}')
+        lines.append(f'stock_cache_requests_total{{cache="{cache}",result="miss"}} {c["misses"]}')
+    return '\n'.join(lines) + '\n'
+
+# Instance tunggal per proses
+metrics = Metrics()
+
+timer = metrics.timer
+timed = metrics.timed
@@ -0,0 +1,612 @@
+"""
+Model loading & inferensi: registry model Keras, scaler, dan backend inferensi.
+TensorFlow baru di-import saat model pertama kali dipakai, supaya halaman yang
+tidak melakukan forecast (Evaluasi, XAI) tidak menanggung biaya import TF.
+"""
+import os
+import logging
+import sys
+import threading
+import weakref
+import joblib
+import numpy as np
+from collections import OrderedDict
+
+from utils.data_loader import (
+    load_dataset_index,
+    EMITENS,
+    MODEL_FEATS,
+    SCENARIOS,
+    MODEL_DIR
+)
+from utils.scaling import Denormalizer
+from utils.metrics import metrics, timer, timed
+from utils.cache import memoize
+
+# Konfigurasi registry model (bisa dioverride lewat environment variable)
+# MODEL_REGISTRY_MODE   : 'lazy' (load saat dipakai) atau 'eager' (warm semua saat startup)
+# MODEL_REGISTRY_MAX_MB : budget memori bobot model sebelum LRU eviction
+MODEL_REGISTRY_MODE = os.environ.get('MODEL_REGISTRY_MODE', 'lazy')
+MODEL_REGISTRY_MAX_MB = float(os.environ.get('MODEL_REGISTRY_MAX_MB', 512))
+# MODEL_GROUP_CACHE     : jumlah maksimum GroupedModel (graph gabungan) yang di-cache
+MODEL_GROUP_CACHE = int(os.environ.get('MODEL_GROUP_CACHE', 8))
+# SCALER_MODE: 'pickle' (pakai models/scaler_*.pkl hasil training) atau 'refit' (fit ulang dari dataset)
+SCALER_MODE = os.environ.get('SCALER_MODE', 'pickle')
+# INFERENCE_BACKEND: 'tf_function' (default), 'keras' (model.predict), 'saved_model', 'tflite'
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'tf_function')
+EXPORT_DIR = os.path.join(MODEL_DIR, 'export')
+
+logger = logging.getLogger(__name__)
+
+# --- CLASSES UNTUK PATCHING ---
+class PatchedDTypePolicy:
+    def __init__(self, **kwargs):
+        self.name = "float32"
+    def get_config(self):
+        return {"name": "float32"}
+
+_CUSTOM_OBJECTS = None
+
+def custom_objects():
+    """
+    custom_objects untuk load_model. PatchedInputLayer mewarisi layer Keras,
+    jadi kelasnya baru dibuat (dan TF di-import) saat pertama kali dibutuhkan.
+    """
+    global _CUSTOM_OBJECTS
+    if _CUSTOM_OBJECTS is None:
+        from tensorflow.keras.layers import InputLayer
+
+        class PatchedInputLayer(InputLayer):
+            def __init__(self, **kwargs):
+                if 'batch_shape' in kwargs: kwargs['batch_input_shape'] = kwargs.pop('batch_shape')
+                if 'dtype_policy' in kwargs: kwargs.pop('dtype_policy'); kwargs['dtype'] = 'float32'
+                if 'sparse' in kwargs: kwargs['sparse'] = bool(kwargs['sparse'])
+                super().__init__(**kwargs)
+
+        _CUSTOM_OBJECTS = {'InputLayer': PatchedInputLayer, 'DTypePolicy': PatchedDTypePolicy}
+    return _CUSTOM_OBJECTS
+
+# --- SCALER STORE ---
+
+def scaler_path_for(emiten):
+    return os.path.join(MODEL_DIR, f'scaler_{emiten}.pkl')
+
+def fit_scaler_from_dataset(emiten):
+    """
+    Fallback: fit MinMaxScaler dari seluruh histori emiten (perilaku lama).
+    """
+    from sklearn.preprocessing import MinMaxScaler
+    block = load_dataset_index().get_block(emiten)
+    feats = block.snapshot().feats if block is not None else None
+    if feats is None or len(feats) == 0: return None
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(feats)
+    return scaler
+
+def validate_scaler(scaler):
+    """
+    Pastikan scaler cocok dengan MODEL_FEATS (jumlah & urutan fitur).
+    Return pesan error, atau None jika valid.
+    """
+    n_feats = getattr(scaler, 'n_features_in_', None)
+    if n_feats != len(MODEL_FEATS):
+        return f"jumlah fitur {n_feats} != {len(MODEL_FEATS)}"
+    names = getattr(scaler, 'feature_names_in_', None)
+    if names is not None and list(names) != MODEL_FEATS:
+        return f"urutan fitur {list(names)} != {MODEL_FEATS}"
+    if np.shape(getattr(scaler, 'data_min_', None)) != (len(MODEL_FEATS),):
+        return "scaler belum di-fit"
+    return None
+
+class ScalerStore:
+    """
+    Cache scaler per emiten. Default memakai scaler_{EMITEN}.pkl hasil training;
+    refit dari dataset hanya dipakai sebagai fallback eksplisit (dan dicatat di log).
+    """
+    def __init__(self, mode=SCALER_MODE):
+        self.mode = mode
+        self._entries = {}  # emiten -> (scaler, mtime, source)
+        self._denorm = {}  # tuple emiten -> (scaler ids, Denormalizer)
+        self._lock = threading.Lock()
+
+    def source(self, emiten):
+        entry = self._entries.get(emiten)
+        return entry[2] if entry else None
+
+    def get(self, emiten):
+        path = scaler_path_for(emiten)
+        try:
+            mtime = os.path.getmtime(path) if self.mode == 'pickle' else None
+        except OSError:
+            mtime = None
+
+        entry = self._entries.get(emiten)
+        if entry is not None and entry[1] == mtime:
+            return entry[0]
+
+        with self._lock:
+            entry = self._entries.get(emiten)
+            if entry is not None and entry[1] == mtime:
+                return entry[0]
+
+            scaler, source = None, 'pickle'
+            if mtime is not None:
+                try:
+                    with timer('scaler.load'):
+                        scaler = joblib.load(path)
+                    problem = validate_scaler(scaler)
+                except Exception as e:
+                    problem = str(e)
+                if problem:
+                    logger.warning("Scaler %s tidak valid (%s), fallback ke refit", path, problem)
+                    scaler = None
+
+            if scaler is None:
+                if self.mode == 'pickle':
+                    logger.warning("Refit MinMaxScaler untuk %s dari dataset (fallback)", emiten)
+                else:
+                    logger.info("Refit MinMaxScaler untuk %s dari dataset (SCALER_MODE=refit)", emiten)
+                with timer('scaler.fit'):
+                    scaler, source = fit_scaler_from_dataset(emiten), 'refit'
+                if scaler is None: return None
+
+            self._entries[emiten] = (scaler, mtime, source)
+            return scaler
+
+    def denormalizer(self, emitens):
+        """
+        Denormalizer untuk kumpulan emiten; koefisien dihitung ulang hanya jika scaler berganti.
+        Emiten tanpa scaler tidak ikut (cek dengan `emiten in denorm`).
+        """
+        emitens = (emitens,) if isinstance(emitens, str) else tuple(emitens)
+        scalers = {e: s for e in emitens if (s := self.get(e)) is not None}
+        scaler_ids = tuple(id(s) for s in scalers.values())
+        cached = self._denorm.get(emitens)
+        if cached is not None and cached[0] == scaler_ids:
+            return cached[1]
+
+        denorm = Denormalizer(scalers)
+        self._denorm[emitens] = (scaler_ids, denorm)
+        return denorm
+
+    def invalidate(self, emiten=None):
+        with self._lock:
+            self._denorm.clear()
+            for key in list(self._entries):
+                if emiten is None or key == emiten:
+                    del self._entries[key]
+
+# --- MODEL REGISTRY ---
+
+class GroupedModel:
+    """
+    Satu tf.function yang memanggil banyak model sekaligus. Input berupa list
+    flat (urut sesuai member; fusion = quant, qual), output list (N, 3) per member.
+    """
+    def __init__(self, members):
+        import tensorflow as tf
+        self.members = list(members)
+        self.n_inputs = [len(m.inputs) for m in self.members]
+        signature = [tf.TensorSpec((None,) + tuple(t.shape[1:]), tf.float32) for m in self.members for t in m.inputs]
+        self._fn = tf.function(self._call, input_signature=signature)
+
+    def _call(self, *inputs):
+        outputs, pos = [], 0
+        for model, n in zip(self.members, self.n_inputs):
+            x = list(inputs[pos:pos + n])
+            outputs.append(model(x if n > 1 else x[0], training=False))
+            pos += n
+        return outputs
+
+    @timed('inference.grouped')
+    def predict_on_batch(self, inputs):
+        import tensorflow as tf
+        tensors = [tf.convert_to_tensor(x, dtype=tf.float32) for x in inputs]
+        return [o.numpy() for o in self._fn(*tensors)]
+
+def model_path_for(emiten, scenario):
+    return os.path.join(MODEL_DIR, f'model_{scenario}_{emiten}.h5')
+
+class ModelRegistry:
+    """
+    Cache model Keras per (emiten, scenario) yang dishare satu proses.
+    Model di-load sekali, di-evict LRU jika melebihi budget memori,
+    dan di-reload otomatis jika mtime file .h5 berubah. GroupedModel memegang
+    referensi ke membernya, jadi group ikut dibuang begitu salah satu member keluar.
+    """
+    def __init__(self, max_mb=MODEL_REGISTRY_MAX_MB, mode=MODEL_REGISTRY_MODE, max_groups=MODEL_GROUP_CACHE):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.mode = mode
+        self._entries = OrderedDict()  # (emiten, scenario) -> (model, mtime, nbytes)
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self.max_groups = max_groups
+        self._groups = OrderedDict()  # tuple key -> (member ids, grouped model), LRU
+        self.scalers = ScalerStore()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def used_bytes(self):
+        return sum(e[2] for e in self._entries.values())
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, emiten, scenario):
+        """
+        Ambil model dari cache; load dari disk jika belum ada / file berubah.
+        Return None jika file model tidak ditemukan.
+        """
+        key = (emiten, scenario)
+        path = model_path_for(emiten, scenario)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self.invalidate(emiten, scenario)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == mtime:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.hit('model_registry', True)
+                return entry[0]
+            if entry is not None:
+                # File berubah: lepas model lama beserta semua group yang memegangnya
+                del self._entries[key]
+                self._drop_groups({key})
+
+        # Lock per key: sesi lain yang minta model yang sama menunggu, bukan ikut load
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == mtime:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.hit('model_registry', True)
+                    return entry[0]
+
+            with timer('model.load'):
+                from tensorflow.keras.models import load_model
+                model = load_model(path, custom_objects=custom_objects())
+            metrics.hit('model_registry', False)
+            nbytes = model.count_params() * 4  # bobot float32
+
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = (model, mtime, nbytes)
+                self._entries.move_to_end(key)
+                self._evict()
+            return model
+
+    def _evict(self):
+        # Model yang baru saja masuk tidak pernah dibuang walau sendirian melebihi budget
+        evicted = set()
+        while len(self._entries) > 1 and self.used_bytes > self.max_bytes:
+            evicted.add(self._entries.popitem(last=False)[0])
+        if evicted: self._drop_groups(evicted)
+
+    def _drop_groups(self, keys):
+        # Buang group yang berisi salah satu key (agar model ter-evict benar-benar lepas)
+        for group_keys in [g for g in self._groups if not keys.isdisjoint(g)]:
+            del self._groups[group_keys]
+
+    def get_group(self, keys):
+        """
+        Gabungkan beberapa model (emiten, scenario) menjadi satu graph TF
+        dengan input/output paralel, supaya semua bisa dieksekusi dalam satu call.
+        Urutan input mengikuti keys; model fusion memakan 2 input (quant, qual).
+        """
+        keys = tuple(keys)
+        members = [self.get(emiten, scenario) for emiten, scenario in keys]
+        if any(m is None for m in members): return None
+        member_ids = tuple(id(m) for m in members)
+
+        with self._lock:
+            cached = self._groups.get(keys)
+            if cached is not None and cached[0] == member_ids:
+                self._groups.move_to_end(keys)
+                return cached[1]
+
+        grouped = GroupedModel(members)
+        with self._lock:
+            # Hanya di-cache jika semua member masih resident (group melebihi budget
+            # memori tetap dipakai untuk call ini, tapi tidak ditahan)
+            resident = all(key in self._entries and id(self._entries[key][0]) == mid
+                           for key, mid in zip(keys, member_ids))
+            if resident and self.max_groups > 0:
+                self._groups[keys] = (member_ids, grouped)
+                self._groups.move_to_end(keys)
+                while len(self._groups) > self.max_groups:
+                    self._groups.popitem(last=False)
+        return grouped
+
+    def invalidate(self, emiten=None, scenario=None):
+        with self._lock:
+            stale = {key for key in self._entries
+                     if (emiten is None or key[0] == emiten) and (scenario is None or key[1] == scenario)}
+            for key in stale:
+                del self._entries[key]
+            if emiten is None and scenario is None:
+                self._groups.clear()
+            else:
+                self._drop_groups(stale | {(emiten, scenario)})
+
+    def warm_all(self, emitens=EMITENS, scenarios=SCENARIOS):
+        """
+        Eager mode: load semua model sekaligus (dipanggil saat startup).
+        """
+        for emiten in emitens:
+            self.scalers.get(emiten)
+            for scenario in scenarios:
+                try:
+                    self.get(emiten, scenario)
+                except Exception:
+                    pass
+        return self.keys()
+
+@memoize(backend='memory', maxsize=1)
+def get_model_registry():
+    """
+    Registry tunggal per proses, dishare ke semua sesi Streamlit.
+    """
+    registry = ModelRegistry()
+    if registry.mode == 'eager':
+        registry.warm_all()
+    return registry
+
+@timed('model.load_prediction_model')
+def load_prediction_model(emiten, scenario):
+    try:
+        registry = get_model_registry()
+        model = registry.get(emiten, scenario)
+        if model is None: return None, None
+
+        # Scaler hasil training (fallback refit jika .pkl hilang / tidak cocok)
+        scaler = registry.scalers.get(emiten)
+        if scaler is None: return None, None
+
+        return model, scaler
+
+    except Exception as e:
+        return None, None
+
+# --- INFERENCE BACKENDS ---
+
+def serving_signature(model, batch_size=1):
+    """
+    TensorSpec input model dengan batch tetap: (1, 60, 7) atau [(1, 60, 7), (1, 60, 4)].
+    """
+    import tensorflow as tf
+    return [tf.TensorSpec((batch_size,) + tuple(t.shape[1:]), tf.float32, name=t.name) for t in model.inputs]
+
+def _as_input_list(inputs):
+    if isinstance(inputs, (list, tuple)): return [np.asarray(x, dtype='float32') for x in inputs]
+    return [np.asarray(inputs, dtype='float32')]
+
+class KerasPredictBackend:
+    """
+    Jalur referensi: model.predict (tf.data + callbacks, lambat untuk batch 1).
+    """
+    name = 'keras'
+
+    def predict(self, model, inputs, emiten=None, scenario=None):
+        return model.predict(inputs, verbose=0)
+
+class TFFunctionBackend:
+    """
+    Call model langsung lewat tf.function dengan input_signature tetap (batch 1),
+    tanpa overhead pipeline model.predict. Batch > 1 memakai signature batch dinamis.
+    """
+    name = 'tf_function'
+
+    def __init__(self):
+        self._fns = weakref.WeakKeyDictionary()  # model -> {batch_size: tf.function}
+        self._lock = threading.Lock()
+
+    def _function(self, model, batch_size):
+        import tensorflow as tf
+        with self._lock:
+            fns = self._fns.setdefault(model, {})
+            fn = fns.get(batch_size)
+            if fn is None:
+                n_inputs = len(model.inputs)
+                def call(*x):
+                    return model(list(x) if n_inputs > 1 else x[0], training=False)
+                fn = tf.function(call, input_signature=serving_signature(model, batch_size))
+                fns[batch_size] = fn
+            return fn
+
+    def predict(self, model, inputs, emiten=None, scenario=None):
+        xs = _as_input_list(inputs)
+        batch_size = 1 if xs[0].shape[0] == 1 else None
+        return self._function(model, batch_size)(*xs).numpy()
+
+def export_path_for(emiten, scenario, fmt='saved_model'):
+    base = os.path.join(EXPORT_DIR, f'{scenario}_{emiten}')
+    return base + '.tflite' if fmt == 'tflite' else base
+
+def export_serving_model(emiten, scenario, fmt='saved_model'):
+    """
+    Export model ke SavedModel (signature batch 1) atau TFLite untuk serving CPU.
+    Konversi TFLite bisa meng-abort proses di beberapa versi TF/Keras, jadi jalankan
+    offline lewat CLI: python -m utils.model_loader export [tflite]
+    """
+    import tensorflow as tf
+    model = get_model_registry().get(emiten, scenario)
+    if model is None: return None
+    saved_dir = export_path_for(emiten, scenario)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+
+    module = tf.Module()
+    module.model = model
+    n_inputs = len(model.inputs)
+    module.serve = tf.function(
+        lambda *x: model(list(x) if n_inputs > 1 else x[0], training=False),
+        input_signature=serving_signature(model, 1)
+    )
+    tf.saved_model.save(module, saved_dir, signatures={'serving_default': module.serve})
+    if fmt != 'tflite': return saved_dir
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_dir)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+    tflite_path = export_path_for(emiten, scenario, 'tflite')
+    with open(tflite_path, 'wb') as f:
+        f.write(converter.convert())
+    return tflite_path
+
+class SavedModelBackend:
+    """
+    Pakai SavedModel hasil export_serving_model; fallback ke tf.function jika belum diexport.
+    """
+    name = 'saved_model'
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._fns = {}  # (emiten, scenario) -> (mtime, concrete fn, input names)
+        self._lock = threading.Lock()
+
+    def _load(self, emiten, scenario):
+        path = export_path_for(emiten, scenario)
+        try:
+            mtime = os.path.getmtime(os.path.join(path, 'saved_model.pb'))
+        except OSError:
+            return None
+        key = (emiten, scenario)
+        with self._lock:
+            entry = self._fns.get(key)
+            if entry is None or entry[0] != mtime:
+                import tensorflow as tf
+                fn = tf.saved_model.load(path).signatures['serving_default']
+                names = [spec.name for spec in fn.structured_input_signature[1].values()]
+                entry = (mtime, fn, names)
+                self._fns[key] = entry
+            return entry
+
+    def predict(self, model, inputs, emiten=None, scenario=None):
+        entry = self._load(emiten, scenario) if emiten else None
+        xs = _as_input_list(inputs)
+        if entry is None or xs[0].shape[0] != 1:
+            return self.fallback.predict(model, inputs, emiten, scenario)
+        _, fn, _ = entry
+        # Nama input signature mengikuti model.inputs (mis. in_quant, in_qual)
+        feed = {t.name: x for t, x in zip(model.inputs, xs)}
+        return next(iter(fn(**feed).values())).numpy()
+
+class TFLiteBackend:
+    """
+    Interpreter TFLite untuk file .tflite hasil export (pakai tflite_runtime jika terpasang).
+    Interpreter tidak thread-safe, jadi setiap file punya lock sendiri.
+    """
+    name = 'tflite'
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._interpreters = {}  # (emiten, scenario) -> (mtime, interpreter, lock)
+        self._lock = threading.Lock()
+
+    def _load(self, emiten, scenario):
+        path = export_path_for(emiten, scenario, 'tflite')
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        key = (emiten, scenario)
+        with self._lock:
+            entry = self._interpreters.get(key)
+            if entry is None or entry[0] != mtime:
+                try:
+                    from tflite_runtime.interpreter import Interpreter
+                except ImportError:
+                    import tensorflow as tf
+                    Interpreter = tf.lite.Interpreter
+                interpreter = Interpreter(model_path=path)
+                interpreter.allocate_tensors()
+                entry = (mtime, interpreter, threading.Lock())
+                self._interpreters[key] = entry
+            return entry
+
+    def predict(self, model, inputs, emiten=None, scenario=None):
+        entry = self._load(emiten, scenario) if emiten else None
+        xs = _as_input_list(inputs)
+        if entry is None or xs[0].shape[0] != 1:
+            return self.fallback.predict(model, inputs, emiten, scenario)
+        _, interpreter, lock = entry
+        by_name = {t.name: x for t, x in zip(model.inputs, xs)}
+        with lock:
+            for detail in interpreter.get_input_details():
+                # Nama tensor TFLite berbentuk 'serving_default_in_quant:0'
+                name = next(n for n in by_name if n in detail['name'])
+                interpreter.set_tensor(detail['index'], by_name[name])
+            interpreter.invoke()
+            return interpreter.get_tensor(interpreter.get_output_details()[0]['index']).copy()
+
+_BACKENDS = {}
+
+def get_inference_backend(name=None):
+    name = name or INFERENCE_BACKEND
+    if name not in _BACKENDS:
+        if name == 'keras': _BACKENDS[name] = KerasPredictBackend()
+        elif name == 'tf_function': _BACKENDS[name] = TFFunctionBackend()
+        elif name == 'saved_model': _BACKENDS[name] = SavedModelBackend(get_inference_backend('tf_function'))
+        elif name == 'tflite': _BACKENDS[name] = TFLiteBackend(get_inference_backend('tf_function'))
+        else: raise ValueError(f"Inference backend tidak dikenal: {name}")
+    return _BACKENDS[name]
+
+def run_inference(model, inputs, emiten=None, scenario=None, backend=None):
+    """
+    Prediksi (N, 3) lewat backend aktif. Input baseline: X_quant,
+    input fusion: [X_quant, X_qual].
+    """
+    impl = get_inference_backend(backend)
+    with timer(f'inference.{impl.name}'):
+        return np.asarray(impl.predict(model, inputs, emiten, scenario))
+
+class BackendParityError(AssertionError):
+    # Di-raise eksplisit (bukan assert) agar tetap aktif di bawah python -O
+    def __init__(self, backend, diff, atol):
+        super().__init__(f"{backend} menyimpang dari model.predict ({diff:.2e} > atol {atol:.0e})")
+        self.backend = backend
+        self.diff = diff
+
+def check_backend_parity(emiten, scenario, backend, atol=1e-4):
+    """
+    Bandingkan output backend dengan jalur model.predict pada window acak.
+    Return selisih absolut maksimum; raise BackendParityError jika > atol, atau
+    FileNotFoundError jika model / artefak export backend tidak ada (backend
+    saved_model/tflite diam-diam fallback ke tf_function, jadi selisihnya tidak bermakna).
+    """
+    model = get_model_registry().get(emiten, scenario)
+    if model is None: raise FileNotFoundError(model_path_for(emiten, scenario))
+    impl = get_inference_backend(backend)
+    if isinstance(impl, (SavedModelBackend, TFLiteBackend)) and impl._load(emiten, scenario) is None:
+        fmt = 'tflite' if isinstance(impl, TFLiteBackend) else 'saved_model'
+        raise FileNotFoundError(f"artefak {backend} belum diexport: {export_path_for(emiten, scenario, fmt)}")
+    rng = np.random.default_rng(0)
+    xs = [rng.random((1,) + tuple(t.shape[1:]), dtype='float32') for t in model.inputs]
+    inputs = xs if len(xs) > 1 else xs[0]
+    ref = run_inference(model, inputs, emiten, scenario, backend='keras')
+    out = run_inference(model, inputs, emiten, scenario, backend=backend)
+    diff = float(np.max(np.abs(ref - out)))
+    if not diff <= atol: raise BackendParityError(backend, diff, atol)
+    return diff
+
+if __name__ == '__main__':
+    # Export artefak serving: python -m utils.model_loader export [tflite]
+    if len(sys.argv) > 1 and sys.argv[1] == 'export':
+        fmt = sys.argv[2] if len(sys.argv) > 2 else 'saved_model'
+        for emiten in EMITENS:
+            for scenario in SCENARIOS:
+                path = export_serving_model(emiten, scenario, fmt)
+                if not path:
+                    print(f"{emiten} {scenario}: model tidak ditemukan, dilewati")
+                    continue
+                print(f"{emiten} {scenario}: {path}")
+                print(f"  parity {scenario}_{emiten}: {check_backend_parity(emiten, scenario, fmt):.2e}")
@@ -0,0 +1,133 @@
+"""
+Pipeline forecast sebagai job asinkron: window -> model -> inferensi -> denormalisasi.
+Tiap skenario (baseline, fusion) berjalan di thread pool sendiri secara paralel,
+dan setiap tahap mengirim StageEvent (dengan durasi) yang bisa di-stream ke UI.
+Dengan FORECAST_SHARD_POOL=1, tahap inferensi dikirim ke ShardPool proses-wide
+(worker per shard model); jika worker tidak tersedia, kembali ke inferensi lokal.
+"""
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.data_loader import load_dataset_index, SCENARIOS
+from utils.model_loader import get_model_registry, run_inference
+from utils.forecast import scale_windows, model_inputs
+from utils.forecast_cache import forecast_key, get_forecast_cache
+from utils.metrics import metrics
+from utils.shard_pool import FORECAST_SHARD_POOL, get_shard_pool
+
+# Urutan tahap per skenario (cache hit melompati model/inference/denormalize)
+STAGES = ('window', 'model', 'inference', 'denormalize')
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='forecast')
+logger = logging.getLogger(__name__)
+
+class StageEvent:
+    """
+    Satu tahap selesai. stage: salah satu STAGES, 'cache' (hit), 'done' atau 'error'.
+    """
+    def __init__(self, scenario, stage, ms, detail=None):
+        self.scenario = scenario
+        self.stage = stage
+        self.ms = ms
+        self.detail = detail
+
+    def __repr__(self):
+        return f"StageEvent({self.scenario}, {self.stage}, {self.ms:.1f} ms)"
+
+class ForecastJob:
+    """
+    Job forecast satu emiten untuk beberapa skenario sekaligus.
+    Registry & index di-resolve di thread pemanggil (thread script Streamlit),
+    jadi worker thread tidak pernah menyentuh API Streamlit.
+    pool: ShardPool opsional (default get_shard_pool() jika FORECAST_SHARD_POOL aktif).
+    """
+    def __init__(self, emiten, scenarios=SCENARIOS, window_size=60, index=None, registry=None, use_cache=True,
+                 pool=None):
+        self.emiten = emiten
+        self.scenarios = list(scenarios)
+        self.window_size = window_size
+        self.index = index if index is not None else load_dataset_index()
+        self.registry = registry if registry is not None else get_model_registry()
+        self.use_cache = use_cache
+        self.pool = pool if pool is not None else (get_shard_pool() if FORECAST_SHARD_POOL else None)
+        self.results = {}  # scenario -> harga H+1..H+3 (None jika gagal)
+        self.timings = {}  # (scenario, stage) -> ms
+        self._events = queue.Queue()
+        self._futures = [_executor.submit(self._run, sc) for sc in self.scenarios]
+
+    @property
+    def total_stages(self):
+        return len(self.scenarios) * len(STAGES)
+
+    def _emit(self, scenario, stage, t0, detail=None):
+        ms = (time.perf_counter() - t0) * 1000
+        self.timings[(scenario, stage)] = ms
+        if stage not in ('done', 'error'): metrics.observe(f'pipeline.{stage}', ms)
+        self._events.put(StageEvent(scenario, stage, ms, detail))
+        return time.perf_counter()
+
+    def _run(self, scenario):
+        t0 = start = time.perf_counter()
+        try:
+            raw = self.index.get_window(self.emiten, n=self.window_size)
+            key = forecast_key(self.emiten, scenario, self.window_size, self.index) if raw is not None else None
+            cache = get_forecast_cache()
+            prices = cache.get(key) if (self.use_cache and key is not None) else None
+            t0 = self._emit(scenario, 'window', t0)
+            if prices is not None:
+                self._emit(scenario, 'cache', t0)
+            elif raw is not None:
+                # Mode pool: model hidup di worker, proses ini tidak perlu load
+                routed = self.pool is not None and (self.emiten, scenario) in self.pool
+                model = None if routed else self.registry.get(self.emiten, scenario)
+                denorm = self.registry.scalers.denormalizer(self.emiten)
+                t0 = self._emit(scenario, 'model', t0)
+                if (routed or model is not None) and self.emiten in denorm:
+                    scaled = scale_windows(raw[None], denorm, [self.emiten])
+                    pred_sc = self._infer(scenario, scaled, model)
+                    t0 = self._emit(scenario, 'inference', t0)
+                    prices = denorm.inverse_price(pred_sc, self.emiten)
+                    if key is not None: cache.put(key, prices)
+                    self._emit(scenario, 'denormalize', t0)
+            self.results[scenario] = prices
+            self._emit(scenario, 'done', start)
+        except Exception as e:
+            self.results[scenario] = None
+            self._emit(scenario, 'error', start, detail=str(e))
+
+    def _infer(self, scenario, scaled, model=None):
+        """
+        Prediksi ter-scale (3,) untuk satu window; lewat pool jika model tidak di-load lokal.
+        """
+        if model is None:
+            try:
+                return self.pool.predict(self.emiten, scenario, scaled).result()[0]
+            except RuntimeError:
+                logger.warning("ShardPool gagal untuk %s_%s, fallback inferensi lokal", scenario, self.emiten)
+                model = self.registry.get(self.emiten, scenario)
+                if model is None: raise
+        inputs = model_inputs(scaled, scenario)
+        return run_inference(model, inputs if len(inputs) > 1 else inputs[0], self.emiten, scenario)[0]
+
+    def events(self, timeout=None):
+        """
+        Generator StageEvent sesuai urutan selesai, berhenti setelah semua skenario done/error.
+        """
+        remaining = len(self.scenarios)
+        while remaining:
+            event = self._events.get(timeout=timeout)
+            if event.stage in ('done', 'error'): remaining -= 1
+            yield event
+
+    def result(self, timeout=None):
+        """
+        Tunggu semua skenario selesai. Return dict scenario -> harga (atau None).
+        """
+        for future in self._futures:
+            future.result(timeout=timeout)
+        return {sc: self.results.get(sc) for sc in self.scenarios}
+
+def submit_forecast(emiten, scenarios=SCENARIOS, window_size=60, index=None):
+    return ForecastJob(emiten, scenarios, window_size, index)
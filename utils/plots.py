@@ -1,147 +1,280 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
 
-def plot_advanced_technical(df, emiten, show_ma=True, show_vol=True, show_macd=False, show_rsi=False):
-    """
-    Professional Charting with Dynamic Indicator Layout (TradingView Style)
-    """
-    df_plot = df.copy()
+from utils.cache import LRUCache
+from utils.downsample import CHART_MAX_POINTS, LEVEL_LABELS, adaptive_ohlcv, decimate_line
+from utils.metrics import metrics, timed
 
-    # 1. Tentukan Struktur Layout (Berapa baris?)
-    panels = ['price']
-    if show_vol: panels.append('volume')
-    if show_macd: panels.append('macd')
-    if show_rsi: panels.append('rsi')
+# --- TECHNICAL CHART ---
 
-    n_rows = len(panels)
-    
-    # Hitung Tinggi Baris secara Proporsional
-    if n_rows == 1: row_heights = [1.0]
-    elif n_rows == 2: row_heights = [0.7, 0.3]
-    elif n_rows == 3: row_heights = [0.6, 0.2, 0.2]
-    elif n_rows == 4: row_heights = [0.5, 0.15, 0.15, 0.2]
-    else: row_heights = [1.0/n_rows] * n_rows 
+# Urutan panel tetap; harga selalu ada, sisanya opsional
+TECH_PANELS = ['price', 'volume', 'macd', 'rsi']
+PANEL_LABELS = {'volume': 'Volume', 'macd': 'MACD', 'rsi': 'RSI'}
+# Tinggi baris proporsional per jumlah panel aktif
+PANEL_HEIGHTS = {1: [1.0], 2: [0.7, 0.3], 3: [0.6, 0.2, 0.2], 4: [0.5, 0.15, 0.15, 0.2]}
+PANEL_SPACING = 0.03
+INCR_COLOR = '#00C853' # Hijau Vivid
+DECR_COLOR = '#FF3D00' # Merah Vivid
+
+# Spec figure interaktif (dict) per (emiten, timeframe, budget titik, indikator awal), shared antar sesi
+_tech_figures = LRUCache(maxsize=32)
+
+@timed('plot.technical_build')
+def build_technical(df, emiten, panels, show_ma=True, max_points=CHART_MAX_POINTS):
+    """
+    Figure teknikal untuk `panels` (subset TECH_PANELS, urut) saja. Tiap trace ditandai
+    meta=<panel/'ma'> dan garis batas RSI name='rsi', untuk toggle di technical_figure.
+    Range panjang: candle/volume diresample ke OHLCV mingguan/bulanan dan garis
+    indikator didesimasi LTTB, jadi tiap trace maksimal `max_points` titik.
+    """
+    df_plot = df
+    # Bar (candle, volume, histogram) dari frame teragregasi; garis dari data harian
+    bars, level = adaptive_ohlcv(df_plot, max_points)
+    line = lambda values: decimate_line(df_plot['date'], values, max_points)
+    row = {panel: i for i, panel in enumerate(panels, start=1)}
 
     fig = make_subplots(
-        rows=n_rows, cols=1, 
-        shared_xaxes=True, 
-        vertical_spacing=0.03,
-        row_heights=row_heights
+        rows=len(panels), cols=1,
+        shared_xaxes=True,
+        vertical_spacing=PANEL_SPACING,
+        row_heights=PANEL_HEIGHTS[len(panels)]
     )
 
     # --- PANEL 1: PRICE CHART (Selalu Ada) ---
-    incr_color = '#00C853' # Hijau Vivid
-    decr_color = '#FF3D00' # Merah Vivid
-    
-    # Candlestick
     fig.add_trace(go.Candlestick(
-        x=df_plot['date'],
-        open=df_plot['X1'], high=df_plot['X2'],
-        low=df_plot['X3'], close=df_plot['Yt'],
-        name='OHLC',
-        increasing_line_color=incr_color,
-        decreasing_line_color=decr_color
+        x=bars['date'],
+        open=bars['X1'], high=bars['X2'],
+        low=bars['X3'], close=bars['Yt'],
+        name='OHLC', meta='price',
+        increasing_line_color=INCR_COLOR,
+        decreasing_line_color=DECR_COLOR
     ), row=1, col=1)
 
     # Moving Average (Opsional)
     if show_ma:
+        # MA20 sudah dihitung di loader (histori penuh); fallback rolling untuk frame lain
+        ma20 = df_plot['ma20'] if 'ma20' in df_plot.columns else df_plot['Yt'].rolling(window=20).mean()
+        ma_x, ma_y = line(ma20)
         fig.add_trace(go.Scatter(
-            x=df_plot['date'], y=df_plot['Yt'].rolling(window=20).mean(),
+            x=ma_x, y=ma_y, meta='ma',
             name='MA (20)', line=dict(color='#2962FF', width=1.5), opacity=0.8
         ), row=1, col=1)
 
-    # --- PANEL DINAMIS (Volume, MACD, RSI) ---
-    curr_row = 2
-
-    # 2. VOLUME
-    if show_vol:
-        vol_colors = [incr_color if c >= o else decr_color for c, o in zip(df_plot['Yt'], df_plot['X1'])]
+    # --- VOLUME ---
+    if 'volume' in row:
+        vol_colors = np.where(bars['Yt'].to_numpy() >= bars['X1'].to_numpy(), INCR_COLOR, DECR_COLOR)
         fig.add_trace(go.Bar(
-            x=df_plot['date'], y=df_plot['X4'],
+            x=bars['date'], y=bars['X4'], meta='volume',
             name='Volume', marker_color=vol_colors, opacity=0.5
-        ), row=curr_row, col=1)
+        ), row=row['volume'], col=1)
         # Format Y-Axis Volume
-        fig.update_yaxes(title_text="Vol", row=curr_row, col=1, showgrid=False, showticklabels=False)
-        curr_row += 1
+        fig.update_yaxes(title_text="Vol", row=row['volume'], col=1, showgrid=False, showticklabels=False)
 
-    # 3. MACD
-    if show_macd:
+    # --- MACD ---
+    if 'macd' in row:
         # MACD Line (X5)
+        macd_x, macd_y = line(df_plot['X5'])
         fig.add_trace(go.Scatter(
-            x=df_plot['date'], y=df_plot['X5'],
+            x=macd_x, y=macd_y, meta='macd',
             name='MACD', line=dict(color='#2962FF', width=1.5)
-        ), row=curr_row, col=1)
-        
+        ), row=row['macd'], col=1)
+
         # Signal Line (Cek ketersediaan kolom)
         if 'macd_signal' in df_plot.columns:
-             fig.add_trace(go.Scatter(
-                x=df_plot['date'], y=df_plot['macd_signal'],
+            signal_x, signal_y = line(df_plot['macd_signal'])
+            fig.add_trace(go.Scatter(
+                x=signal_x, y=signal_y, meta='macd',
                 name='Signal', line=dict(color='#FF6D00', width=1.5)
-            ), row=curr_row, col=1)
-        
+            ), row=row['macd'], col=1)
+
         # Histogram (Cek ketersediaan kolom)
-        if 'macd_hist' in df_plot.columns:
-             fig.add_trace(go.Bar(
-                x=df_plot['date'], y=df_plot['macd_hist'],
+        if 'macd_hist' in bars.columns:
+            fig.add_trace(go.Bar(
+                x=bars['date'], y=bars['macd_hist'], meta='macd',
                 name='Hist', marker_color='#B0BEC5'
-            ), row=curr_row, col=1)
+            ), row=row['macd'], col=1)
 
-        fig.update_yaxes(title_text="MACD", row=curr_row, col=1)
-        curr_row += 1
+        fig.update_yaxes(title_text="MACD", row=row['macd'], col=1)
 
-    # 4. RSI (BAGIAN YANG SEBELUMNYA ERROR)
-    if show_rsi:
+    # --- RSI ---
+    if 'rsi' in row:
+        rsi_x, rsi_y = line(df_plot['X6'])
         fig.add_trace(go.Scatter(
-            x=df_plot['date'], y=df_plot['X6'],
+            x=rsi_x, y=rsi_y, meta='rsi',
             name='RSI', line=dict(color='#AA00FF', width=1.5)
-        ), row=curr_row, col=1)
-        
-        # Garis Batas 30/70 (FIXED)
-        # Hapus xref="x" dan yref="y".
-        # Pindahkan opacity keluar dari dict line.
-        fig.add_shape(type="line", row=curr_row, col=1,
-            x0=df_plot['date'].iloc[0], x1=df_plot['date'].iloc[-1],
-            y0=70, y1=70,
-            line=dict(color="gray", width=1, dash="dash"),
-            opacity=0.5 
-        )
-        fig.add_shape(type="line", row=curr_row, col=1,
-            x0=df_plot['date'].iloc[0], x1=df_plot['date'].iloc[-1],
-            y0=30, y1=30,
-            line=dict(color="gray", width=1, dash="dash"),
-            opacity=0.5
-        )
-            
-        fig.update_yaxes(title_text="RSI", range=[0,100], row=curr_row, col=1)
-        curr_row += 1
+        ), row=row['rsi'], col=1)
+
+        # Garis Batas 30/70 (tanpa xref/yref manual; opacity di luar dict line)
+        for level_y in (70, 30):
+            fig.add_shape(type="line", row=row['rsi'], col=1, name='rsi',
+                x0=df_plot['date'].iloc[0], x1=df_plot['date'].iloc[-1],
+                y0=level_y, y1=level_y,
+                line=dict(color="gray", width=1, dash="dash"),
+                opacity=0.5
+            )
+
+        fig.update_yaxes(title_text="RSI", range=[0,100], row=row['rsi'], col=1)
 
     # STYLING GLOBAL
-    height_calc = 400 + (n_rows * 100)
-    
+    title_text = f"<b>{emiten}</b> Market Action"
+    if level != 'D': title_text += f" <span style='font-size:12px;color:#6b7280'>({LEVEL_LABELS[level]} bars)</span>"
+
     fig.update_layout(
-        title=dict(text=f"<b>{emiten}</b> Market Action", font=dict(size=18, family="Inter")),
+        title=dict(text=title_text, font=dict(size=18, family="Inter")),
         template="plotly_white",
-        height=height_calc,
+        height=400 + len(panels) * 100,
         showlegend=False,
         margin=dict(l=10, r=40, t=50, b=20),
         hovermode="x unified",
         xaxis=dict(showgrid=False, type="date", rangeslider=dict(visible=False))
     )
-    
+
     # Hilangkan label X-axis di chart bagian atas
-    for i in range(1, n_rows):
+    for i in range(1, len(panels)):
         fig.update_xaxes(showticklabels=False, row=i, col=1)
+    return fig
 
+@timed('plot.advanced_technical')
+def plot_advanced_technical(df, emiten, show_ma=True, show_vol=True, show_macd=False, show_rsi=False,
+                            max_points=CHART_MAX_POINTS):
+    """
+    Professional Charting with Dynamic Indicator Layout (TradingView Style)
+    """
+    active = {'price': True, 'volume': show_vol, 'macd': show_macd, 'rsi': show_rsi}
+    return build_technical(df, emiten, [p for p in TECH_PANELS if active[p]], show_ma, max_points)
+
+# --- CLIENT-SIDE TOGGLE ---
+
+def panel_layout(shown, n_shapes=0):
+    """
+    Update layout (path bertitik, untuk relayout Plotly.js) yang menampilkan panel `shown`
+    dari figure 4 panel: domain sumbu-y dihitung dari atas seperti make_subplots n baris,
+    panel lain disembunyikan dengan domain kosong.
+    """
+    heights = PANEL_HEIGHTS[len(shown)]
+    usable = 1.0 - PANEL_SPACING * (len(shown) - 1)
+    top, update = 1.0, {'height': 400 + len(shown) * 100}
+    for i, panel in enumerate(TECH_PANELS, start=1):
+        suffix = '' if i == 1 else str(i)
+        visible = panel in shown
+        if visible:
+            h = heights[shown.index(panel)] * usable
+            domain = [max(top - h, 0.0), top]
+            top -= h + PANEL_SPACING
+        else:
+            domain = [0.0, 0.0]
+        update[f'yaxis{suffix}.domain'] = domain
+        update[f'yaxis{suffix}.visible'] = visible
+        update[f'xaxis{suffix}.visible'] = visible
+        # Label X-axis hanya di panel paling bawah
+        update[f'xaxis{suffix}.showticklabels'] = panel == shown[-1]
+    for i in range(n_shapes):
+        update[f'shapes[{i}].visible'] = 'rsi' in shown
+    return update
+
+def add_indicator_menus(fig, show_ma=True, show_vol=True, show_macd=False, show_rsi=False):
+    """
+    Pasang toggle indikator DI DALAM figure (layout.updatemenus): dropdown kombinasi panel
+    (restyle visible + relayout domain) dan tombol MA (restyle visible). Dieksekusi
+    Plotly.js di browser, jadi ganti indikator tanpa rerun Streamlit dan tanpa payload baru.
+    """
+    metas = [trace.meta for trace in fig.data]
+    panel_traces = [i for i, m in enumerate(metas) if m in PANEL_LABELS]
+    ma_traces = [i for i, m in enumerate(metas) if m == 'ma']
+    n_shapes = len(fig.layout.shapes)
+
+    buttons, active_idx = [], 0
+    for vol in (True, False):
+        for macd in (False, True):
+            for rsi in (False, True):
+                flags = {'volume': vol, 'macd': macd, 'rsi': rsi}
+                shown = ['price'] + [p for p in TECH_PANELS[1:] if flags[p]]
+                if (vol, macd, rsi) == (show_vol, show_macd, show_rsi): active_idx = len(buttons)
+                buttons.append(dict(
+                    label=' + '.join(PANEL_LABELS[p] for p in shown[1:]) or 'Price Only',
+                    method='update',
+                    args=[{'visible': [flags[metas[i]] for i in panel_traces]},
+                          panel_layout(shown, n_shapes), panel_traces]
+                ))
+
+    menus = [dict(
+        type='dropdown', direction='down', buttons=buttons, active=active_idx,
+        x=1, xanchor='right', y=1.02, yanchor='bottom', showactive=True
+    )]
+    if ma_traces:
+        # Tombol toggle: args saat ditekan, args2 saat ditekan lagi
+        menus.append(dict(
+            type='buttons', direction='left', showactive=False,
+            buttons=[dict(label='MA (20)', method='restyle',
+                          args=[{'visible': not show_ma}, ma_traces],
+                          args2=[{'visible': show_ma}, ma_traces])],
+            x=0.72, xanchor='right', y=1.02, yanchor='bottom'
+        ))
+
+    # State awal sama dengan tombol aktif
+    for i in panel_traces:
+        fig.data[i].visible = {'volume': show_vol, 'macd': show_macd, 'rsi': show_rsi}[metas[i]]
+    for i in ma_traces:
+        fig.data[i].visible = show_ma
+    shown = ['price'] + [p for p, on in zip(TECH_PANELS[1:], (show_vol, show_macd, show_rsi)) if on]
+    fig.update_layout(panel_layout(shown, n_shapes))
+    fig.update_layout(updatemenus=menus, margin=dict(t=80))
     return fig
 
-def plot_interactive_forecast(df_hist, pred_base, pred_fuse, dates_fut, emiten):
+def _figure_key(df, emiten, max_points):
+    # Timeframe + versi data (ingest menambah baris / memperbarui bar terakhir)
+    if df.empty: return (emiten, 0, max_points)
+    last = df.iloc[-1]
+    return (emiten, len(df), df['date'].iloc[0], last['date'], float(last['Yt']), float(last['X4']), max_points)
+
+def technical_figure(df, emiten, show_ma=False, show_vol=True, show_macd=False, show_rsi=False,
+                     max_points=CHART_MAX_POINTS):
+    """
+    Chart teknikal dengan semua indikator dan toggle client-side (add_indicator_menus);
+    flag show_* hanya menentukan tampilan awal. Dibangun sekali per (emiten, timeframe,
+    level resample) lalu di-cache sebagai spec.
+    """
+    key = _figure_key(df, emiten, max_points) + (show_ma, show_vol, show_macd, show_rsi)
+    spec, found = _tech_figures.get(key)
+    metrics.hit('technical_figure', found)
+    if not found:
+        fig = build_technical(df, emiten, TECH_PANELS, True, max_points)
+        spec = add_indicator_menus(fig, show_ma, show_vol, show_macd, show_rsi).to_dict()
+        _tech_figures.put(key, spec)
+    # Spec sudah tervalidasi saat dibangun; validasi ulang ~70ms per rerun
+    return go.Figure(spec, _validate=False)
+
+@timed('plot.interactive_forecast')
+def plot_interactive_forecast(df_hist, pred_base, pred_fuse, dates_fut, emiten, bands=None):
     """
     Fan Chart untuk Halaman Prediksi
+    bands: opsional output forecast_bands() (quantile harga Fusion) -> area ter-shade
     """
     last_30 = df_hist.tail(90)
     
     fig = go.Figure()
+
+    # Quantile band (pasangan terluar dulu), dijangkar ke harga terakhir agar kipas melebar dari hari ini
+    if bands is not None:
+        q, prices = bands['quantiles'], bands['prices']
+        # Band hanya untuk H+1..H+3 (output langsung model), walau horizon forecast lebih panjang
+        x_band = [last_30['date'].iloc[-1]] + list(dates_fut[:prices.shape[1]])
+        anchor = last_30['Yt'].iloc[-1]
+        for i in range(len(q) // 2):
+            lo, hi = i, len(q) - 1 - i
+            label = f"Fusion {q[hi] - q[lo]:.0%} Interval"
+            fig.add_trace(go.Scatter(
+                x=x_band, y=np.concatenate([[anchor], prices[hi]]),
+                mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=x_band, y=np.concatenate([[anchor], prices[lo]]),
+                mode='lines', line=dict(width=0), fill='tonexty', name=label,
+                fillcolor=f"rgba(0, 82, 204, {0.12 + 0.12 * i:.2f})",
+                customdata=prices[hi], hovertemplate=f"{label}: %{{y:,.0f}} – %{{customdata:,.0f}}<extra></extra>"
+            ))
     
     # Historis
     fig.add_trace(go.Scatter(
@@ -175,16 +308,18 @@ def plot_interactive_forecast(df_hist, pred_base, pred_fuse, dates_fut, emiten):
     ))
 
     fig.update_layout(
-        title=f"Forecast Scenario: {emiten} (Next 3 Days)",
+        title=f"Forecast Scenario: {emiten} (Next {len(dates_fut)} Days)",
         template="plotly_white",
         hovermode="x unified",
         legend=dict(orientation="h", y=1.05, x=1, xanchor="right")
     )
     return fig
 
-def plot_interactive_shap(df_shap, title_text):
+@timed('plot.interactive_shap')
+def plot_interactive_shap(df_shap, title_text, x_title="Mean |SHAP Value| (Impact Magnitude)"):
     """
     Plot SHAP Values secara Interaktif
+    df_shap: kolom Feature Name, Importance, Category (ringkasan CSV maupun explain_window)
     """
     df_sorted = df_shap.sort_values('Importance', ascending=True)
     colors = ['#d62728' if cat == 'Sentiment' else '#1f77b4' for cat in df_sorted['Category']]
@@ -204,7 +339,7 @@ def plot_interactive_shap(df_shap, title_text):
     
     fig.update_layout(
         title=dict(text=f"<b>{title_text}</b>", font=dict(size=18)),
-        xaxis_title="Mean |SHAP Value| (Impact Magnitude)",
+        xaxis_title=x_title,
         yaxis_title=None,
         template="plotly_white",
         height=500,
@@ -0,0 +1,153 @@
+"""
+Forecast rekursif multi-langkah melewati H+3: prediksi model diumpankan kembali ke
+window 60 hari sampai horizon yang diminta (mis. 20 hari).
+
+Per langkah, ketiga output model (H+1..H+3) dijadikan bar baru: Open = close sebelumnya,
+High/Low dari rata-rata shadow window, Volume = rata-rata 20 hari, MACD/RSI diperbarui
+inkremental (IndicatorBatch), sentimen ditahan atau meluruh ke rata-rata window.
+Window ter-scale tiap (emiten, skenario) hidup di ring buffer dan ditulis in place;
+semua emiten x skenario dieksekusi dalam satu call model per langkah.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import load_dataset_index, EMITENS, SCENARIOS, MODEL_FEATS, SENTIMENT_COLS
+from utils.forecast import HORIZON, model_inputs
+from utils.indicators import compute_indicators, IndicatorBatch, MA_WINDOW
+from utils.model_loader import get_model_registry
+from utils.metrics import timed
+
+# FORECAST_HORIZON    : horizon default forecast rekursif (hari)
+# RECURSIVE_SENTIMENT : 'hold' (sentimen terakhir ditahan) atau 'decay' (meluruh ke rata-rata window)
+# SENTIMENT_HALF_LIFE : half-life (hari) untuk mode 'decay'
+FORECAST_HORIZON = int(os.environ.get('FORECAST_HORIZON', 20))
+RECURSIVE_SENTIMENT = os.environ.get('RECURSIVE_SENTIMENT', 'hold')
+SENTIMENT_HALF_LIFE = float(os.environ.get('SENTIMENT_HALF_LIFE', 5))
+
+COL = {name: i for i, name in enumerate(MODEL_FEATS)}
+IDX_SENT = [COL[c] for c in SENTIMENT_COLS]
+
+class WindowRing:
+    """
+    Ring buffer window (N, W, F). Tiap baris ditulis dua kali (posisi p dan p+W) pada
+    buffer (N, 2W, F), sehingga window terurut selalu view contiguous buffer[:, head:head+W]
+    dan push satu bar hanya menulis 2 baris per path.
+    """
+    def __init__(self, windows):
+        n, w, f = windows.shape
+        self.size = w
+        self.buffer = np.empty((n, 2 * w, f), dtype=windows.dtype)
+        self.buffer[:, :w] = windows
+        self.buffer[:, w:] = windows
+        self.head = 0  # posisi baris tertua
+
+    def window(self):
+        return self.buffer[:, self.head:self.head + self.size]
+
+    def push(self, rows):
+        self.buffer[:, self.head] = rows
+        self.buffer[:, self.head + self.size] = rows
+        self.head = (self.head + 1) % self.size
+
+def bar_profile(raw):
+    """
+    Proxy OHLCV per path dari window asli (N, W, F): rasio shadow atas/bawah rata-rata
+    terhadap body candle dan volume rata-rata MA_WINDOW hari terakhir.
+    """
+    o, h, l, c = (raw[..., COL[k]] for k in ('X1', 'X2', 'X3', 'Yt'))
+    body_hi, body_lo = np.maximum(o, c), np.minimum(o, c)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        upper = np.nanmean((h - body_hi) / body_hi, axis=1)
+        lower = np.nanmean((body_lo - l) / body_lo, axis=1)
+    volume = raw[:, -MA_WINDOW:, COL['X4']].mean(axis=1)
+    return np.clip(np.nan_to_num(upper), 0, None), np.clip(np.nan_to_num(lower), 0, None), volume
+
+@timed('forecast.recursive')
+def forecast_recursive(emitens=EMITENS, scenarios=SCENARIOS, horizon=FORECAST_HORIZON, window_size=60,
+                       index=None, sentiment=RECURSIVE_SENTIMENT, half_life=SENTIMENT_HALF_LIFE):
+    """
+    Prediksi H+1..H+horizon untuk semua emiten x skenario. H+1..H+3 identik dengan
+    forecast_all (output langsung model); setelahnya rekursif.
+    Return DataFrame tidy seperti forecast_all: emiten, scenario, horizon, date, price,
+    last_date, last_price.
+    """
+    index = index if index is not None else load_dataset_index()
+    registry = get_model_registry()
+    emitens = [e for e in emitens if index.get_window(e, n=window_size) is not None]
+    denorm = registry.scalers.denormalizer(emitens)
+    emitens = [e for e in emitens if e in denorm]
+    keys = [(e, sc) for e in emitens for sc in scenarios]
+    grouped = registry.get_group(keys) if keys else None
+    if grouped is None: return pd.DataFrame()
+
+    # Satu path per (emiten, skenario); emiten path k = path_emitens[k]
+    emiten_idx = np.repeat(np.arange(len(emitens)), len(scenarios))
+    path_emitens = [emitens[i] for i in emiten_idx]
+    raw = np.stack([index.get_window(e, n=window_size) for e in emitens]).astype('float64')[emiten_idx]
+    ring = WindowRing(denorm.transform(raw, path_emitens))
+
+    # State indikator dari histori close penuh (sekali), diduplikasi per skenario
+    closes = [np.asarray(index.get_block(e).columns['Yt'], dtype='float64') for e in emitens]
+    groups = np.repeat(np.arange(len(emitens)), [len(c) for c in closes])
+    _, states = compute_indicators(np.concatenate(closes), groups)
+    indicators = IndicatorBatch([states[i].copy() for i in emiten_idx])
+
+    upper, lower, volume = bar_profile(raw)
+    last_row = raw[:, -1].copy()
+    sent_last, sent_mean = last_row[:, IDX_SENT].copy(), raw[:, :, IDX_SENT].mean(axis=1)
+
+    n_steps = -(-horizon // HORIZON)
+    paths = np.empty((len(keys), n_steps * HORIZON))
+    day = 0
+    for _ in range(n_steps):
+        window = ring.window()
+        inputs = []
+        for k, (_, sc) in enumerate(keys):
+            inputs.extend(model_inputs(window[k:k + 1], sc))
+        outputs = grouped.predict_on_batch(inputs)
+        preds_sc = np.concatenate([np.asarray(o).reshape(1, -1) for o in outputs])  # (K, 3)
+        prices = denorm.inverse_price(preds_sc.astype('float64'), path_emitens)
+
+        # Tiap output H+j menjadi satu bar baru di semua path sekaligus
+        for j in range(HORIZON):
+            close, prev_close = prices[:, j], last_row[:, COL['Yt']]
+            ind = indicators.update(close)
+            row = last_row.copy()
+            row[:, COL['Yt']] = close
+            row[:, COL['X1']] = prev_close
+            row[:, COL['X2']] = np.maximum(prev_close, close) * (1 + upper)
+            row[:, COL['X3']] = np.minimum(prev_close, close) * (1 - lower)
+            row[:, COL['X4']] = volume
+            row[:, COL['X5']] = ind['macd']
+            row[:, COL['X6']] = ind['rsi']
+            day += 1
+            if sentiment == 'decay':
+                row[:, IDX_SENT] = sent_mean + (sent_last - sent_mean) * 0.5 ** (day / half_life)
+            ring.push(denorm.transform(row[:, None, :], path_emitens)[:, 0])
+            paths[:, day - 1] = close
+            last_row = row
+
+    paths = paths[:, :horizon]
+    last_dates = np.array([index.last_date(e) for e in emitens], dtype='datetime64[ns]')[emiten_idx]
+    h = np.tile(np.arange(1, horizon + 1), len(keys))
+    key_idx = np.repeat(np.arange(len(keys)), horizon)
+    last_d = pd.to_datetime(last_dates[key_idx])
+    return pd.DataFrame({
+        'emiten': np.array(path_emitens)[key_idx],
+        'scenario': np.array([sc for _, sc in keys])[key_idx],
+        'horizon': h,
+        'date': last_d + pd.to_timedelta(h, unit='D'),
+        'price': paths.ravel(),
+        'last_date': last_d,
+        'last_price': raw[:, -1, COL['Yt']][key_idx],
+    })
+
+def predict_paths(emiten, scenarios=SCENARIOS, horizon=FORECAST_HORIZON, window_size=60, index=None):
+    """
+    Jalur satu emiten: {scenario: harga H+1..H+horizon (Rupiah)}; None jika tidak tersedia.
+    """
+    df = forecast_recursive([emiten], scenarios, horizon, window_size, index)
+    if df.empty: return {sc: None for sc in scenarios}
+    return {sc: df.loc[df['scenario'] == sc, 'price'].to_numpy() for sc in scenarios}
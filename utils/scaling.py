@@ -0,0 +1,79 @@
+"""
+Normalisasi & denormalisasi MinMax tanpa memanggil scaler.inverse_transform.
+Koefisien affine tiap scaler diekstrak sekali dan ditumpuk per emiten, sehingga
+tensor prediksi berapapun ukurannya cukup satu operasi x * a + b.
+"""
+import numpy as np
+
+from utils.data_loader import MODEL_FEATS
+
+# Kolom target (Yt) di MODEL_FEATS
+PRICE_FEATURE = 0
+
+def affine_coefficients(scaler):
+    """
+    Koefisien inverse MinMaxScaler: x = x_scaled * inv_scale + inv_offset.
+    Untuk feature_range=(0, 1) ini sama dengan data_range_ dan data_min_.
+    Return (scale, offset, inv_scale, inv_offset), masing-masing (11,) float64.
+    """
+    scale = np.asarray(scaler.scale_, dtype='float64')
+    offset = np.asarray(scaler.min_, dtype='float64')
+    return scale, offset, 1.0 / scale, -offset / scale
+
+class Denormalizer:
+    """
+    Koefisien scaler beberapa emiten dalam array (E, 11).
+    Semua method menerima tensor dengan sumbu pertama = emiten (urut sesuai `emitens`),
+    atau tanpa sumbu emiten jika `emitens` berupa satu string.
+    """
+    def __init__(self, scalers):
+        self.emitens = list(scalers)
+        self._row = {e: i for i, e in enumerate(self.emitens)}
+        coefs = [affine_coefficients(scalers[e]) for e in self.emitens]
+        if coefs:
+            self.scale, self.offset, self.inv_scale, self.inv_offset = (np.stack(c) for c in zip(*coefs))
+        else:
+            self.scale = self.offset = self.inv_scale = self.inv_offset = np.empty((0, len(MODEL_FEATS)))
+
+    def __contains__(self, emiten):
+        return emiten in self._row
+
+    def _coef(self, table, emitens, features, ndim):
+        """
+        Ambil koefisien (E, k) lalu reshape agar broadcast ke tensor berdimensi ndim.
+        features=None -> sumbu terakhir tensor adalah 11 fitur MODEL_FEATS;
+        features=int  -> tensor tanpa sumbu fitur (mis. prediksi Yt (E, N, H));
+        features=list -> sumbu terakhir adalah subset fitur tersebut.
+        """
+        single = isinstance(emitens, str)
+        rows = self._row[emitens] if single else [self._row[e] for e in emitens]
+        coef = table[rows] if features is None else table[rows][..., features]
+        lead = 0 if single else 1
+        if np.ndim(features) == 0 and features is not None:
+            return coef.reshape(coef.shape + (1,) * (ndim - lead))
+        return coef.reshape(coef.shape[:lead] + (1,) * (ndim - lead - 1) + coef.shape[lead:])
+
+    def transform(self, x, emitens, features=None, dtype='float32', out=None):
+        """
+        Raw -> skala model. x: (E, ..., 11) atau (E, ..., k) untuk subset `features`.
+        """
+        x = np.asarray(x)
+        scale = self._coef(self.scale, emitens, features, x.ndim).astype(dtype, copy=False)
+        offset = self._coef(self.offset, emitens, features, x.ndim).astype(dtype, copy=False)
+        out = np.multiply(x, scale, out=out, dtype=dtype)
+        return np.add(out, offset, out=out)
+
+    def inverse(self, x, emitens, features=None, out=None):
+        """
+        Skala model -> Rupiah/nilai asli untuk subset fitur apa pun, satu operasi fused.
+        """
+        x = np.asarray(x)
+        out = np.multiply(x, self._coef(self.inv_scale, emitens, features, x.ndim), out=out, dtype='float64')
+        return np.add(out, self._coef(self.inv_offset, emitens, features, x.ndim), out=out)
+
+    def inverse_price(self, pred, emitens, out=None):
+        """
+        Inverse kolom Yt saja. pred: (E, ...) berapapun dimensinya,
+        mis. (E, 3) untuk forecast atau (E, windows, 3) untuk backtest.
+        """
+        return self.inverse(pred, emitens, features=PRICE_FEATURE, out=out)
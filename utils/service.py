@@ -0,0 +1,324 @@
+"""
+Service HTTP/JSON headless untuk model baseline & fusion (stdlib, tanpa Streamlit).
+Request inferensi untuk (emiten, scenario) yang sama dikumpulkan oleh MicroBatcher
+dalam jendela beberapa ms lalu dieksekusi sebagai satu batch.
+
+Jalankan dari root repo: python -m utils.service [--port 8502] [--max-delay-ms 3]
+
+Endpoint:
+  GET  /health
+  GET  /forecast/<EMITEN>[?scenario=fusion]        window 60 hari terakhir dari dataset
+  POST /forecast/window  {"emiten", "scenario", "window": [[11 fitur] x 60]}  (nilai mentah)
+  POST /forecast/bulk    {"emitens": [...], "scenarios": [...]}              (default semua)
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import load_dataset_index, EMITENS, SCENARIOS, MODEL_FEATS
+from utils.model_loader import get_model_registry, run_inference
+from utils.forecast import model_inputs, HORIZON
+from utils.forecast_cache import forecast_key, get_forecast_cache
+from utils.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+class ServiceError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# --- MICRO-BATCHER ---
+
+class MicroBatcher:
+    """
+    Satu antrean + thread dispatcher per (emiten, scenario). Dispatcher mengambil request
+    pertama, menunggu maksimal max_delay_ms untuk request lain (atau sampai max_batch),
+    lalu menjalankan satu inferensi (N, 60, k) dan membagikan hasilnya ke tiap Future.
+    Jumlah batch yang jalan bersamaan dibatasi max_concurrent (default jumlah core):
+    selama batch lain berjalan, request baru menumpuk sehingga batch berikutnya lebih besar.
+    """
+    def __init__(self, registry=None, max_batch=64, max_delay_ms=3.0, max_concurrent=None, pool=None):
+        self.registry = registry if registry is not None else get_model_registry()
+        # pool: ShardPool opsional; inferensi dikirim ke worker pemilik model
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        default_slots = len(pool.workers) if pool is not None else os.cpu_count()
+        self._slots = threading.BoundedSemaphore(max_concurrent or default_slots or 1)
+        self._queues = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, emiten, scenario, scaled_window):
+        """
+        scaled_window: (60, 11) sudah di-scale. Return Future berisi prediksi ter-scale (3,).
+        """
+        future = Future()
+        self._queue(emiten, scenario).put((scaled_window, future))
+        return future
+
+    def _queue(self, emiten, scenario):
+        key = (emiten, scenario)
+        with self._lock:
+            q = self._queues.get(key)
+            if q is None:
+                q = self._queues[key] = queue.Queue()
+                threading.Thread(target=self._dispatch, args=(key, q), daemon=True,
+                                 name=f'batcher-{scenario}-{emiten}').start()
+            return q
+
+    def _dispatch(self, key, q):
+        while True:
+            items = [q.get()]
+            deadline = time.perf_counter() + self.max_delay
+            while len(items) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0: break
+                try:
+                    items.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self._slots:
+                # Request yang masuk selama menunggu slot ikut batch ini
+                while len(items) < self.max_batch:
+                    try:
+                        items.append(q.get_nowait())
+                    except queue.Empty:
+                        break
+                self._run_batch(key, items)
+
+    def warm(self, keys):
+        """
+        Load model & trace fungsi inferensi (batch 1 dan batch dinamis) sebelum traffic masuk,
+        supaya request pertama tidak menanggung biaya tracing ~1 detik per model.
+        """
+        if self.pool is not None: return  # worker shard sudah warm saat start
+        for emiten, scenario in keys:
+            model = self.registry.get(emiten, scenario)
+            if model is None: continue
+            for n in (1, 2):
+                inputs = model_inputs(np.zeros((n, 60, len(MODEL_FEATS)), dtype='float32'), scenario)
+                run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+
+    def _run_batch(self, key, items):
+        emiten, scenario = key
+        try:
+            batch = np.stack([w for w, _ in items]).astype('float32', copy=False)
+            if self.pool is not None and key in self.pool:
+                with timer('service.batch'):
+                    preds = self.pool.predict(emiten, scenario, batch).result()
+            else:
+                model = self.registry.get(emiten, scenario)
+                if model is None: raise ServiceError(f"model {scenario}_{emiten} tidak ditemukan", 404)
+                inputs = model_inputs(batch, scenario)
+                with timer('service.batch'):
+                    preds = run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+            self.batches += 1
+            self.requests += len(items)
+            for (_, future), pred in zip(items, preds):
+                future.set_result(pred)
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+
+# --- SERVICE ---
+
+def _str_list(value, name):
+    # String tunggal / list bersarang ditolak (bukan diiterasi per karakter)
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ServiceError(f"{name} harus list string")
+    return value
+
+class ForecastService:
+    def __init__(self, index=None, registry=None, max_batch=64, max_delay_ms=3.0, max_concurrent=None,
+                 pool=None, timeout=30):
+        self.index = index if index is not None else load_dataset_index()
+        self.registry = registry if registry is not None else get_model_registry()
+        self.batcher = MicroBatcher(self.registry, max_batch, max_delay_ms, max_concurrent, pool)
+        self.cache = get_forecast_cache()
+        self.timeout = timeout
+
+    def _check(self, emiten, scenario):
+        if emiten not in self.index: raise ServiceError(f"emiten tidak dikenal: {emiten}", 404)
+        if scenario not in SCENARIOS: raise ServiceError(f"scenario harus salah satu dari {SCENARIOS}")
+
+    def _predict_raw(self, emiten, scenario, raw):
+        denorm = self.registry.scalers.denormalizer(emiten)
+        if emiten not in denorm: raise ServiceError(f"scaler {emiten} tidak tersedia", 404)
+        scaled = denorm.transform(raw, emiten)
+        pred_sc = self.batcher.submit(emiten, scenario, scaled).result(timeout=self.timeout)
+        return denorm.inverse_price(pred_sc, emiten)
+
+    def forecast_ticker(self, emiten, scenarios=SCENARIOS):
+        """
+        Forecast dari window terakhir dataset; dari forecast cache jika data & model belum berubah.
+        """
+        return self._collect(*self._submit_ticker(emiten, scenarios))
+
+    def _submit_ticker(self, emiten, scenarios):
+        futures = {}
+        prices = {}
+        for scenario in scenarios:
+            self._check(emiten, scenario)
+            key = forecast_key(emiten, scenario, index=self.index)
+            if key is None: raise ServiceError(f"data {emiten} kurang dari 60 hari", 422)
+            cached = self.cache.get(key)
+            if cached is not None:
+                prices[scenario] = cached
+                continue
+            raw = self.index.get_window(emiten)
+            denorm = self.registry.scalers.denormalizer(emiten)
+            if emiten not in denorm: raise ServiceError(f"scaler {emiten} tidak tersedia", 404)
+            futures[scenario] = (key, denorm, self.batcher.submit(emiten, scenario, denorm.transform(raw, emiten)))
+        return emiten, scenarios, prices, futures
+
+    def _collect(self, emiten, scenarios, prices, futures):
+        for scenario, (key, denorm, future) in futures.items():
+            prices[scenario] = denorm.inverse_price(future.result(timeout=self.timeout), emiten)
+            self.cache.put(key, prices[scenario])
+
+        last_date = self.index.last_date(emiten)
+        return {
+            'emiten': emiten,
+            'last_date': last_date.strftime('%Y-%m-%d'),
+            'dates': [(last_date + pd.Timedelta(days=h)).strftime('%Y-%m-%d') for h in range(1, HORIZON + 1)],
+            'forecasts': {sc: [float(p) for p in prices[sc]] for sc in scenarios},
+        }
+
+    def forecast_window(self, emiten, scenario, window):
+        self._check(emiten, scenario)
+        try:
+            raw = np.asarray(window, dtype='float64')
+        except (ValueError, TypeError):
+            raise ServiceError(f"window harus matriks angka (60, {len(MODEL_FEATS)})")
+        if raw.shape != (60, len(MODEL_FEATS)):
+            raise ServiceError(f"window harus berukuran (60, {len(MODEL_FEATS)}), diterima {raw.shape}")
+        if not np.isfinite(raw).all(): raise ServiceError("window mengandung NaN/inf")
+        prices = self._predict_raw(emiten, scenario, raw)
+        return {'emiten': emiten, 'scenario': scenario, 'forecast': [float(p) for p in prices]}
+
+    def forecast_bulk(self, emitens=EMITENS, scenarios=SCENARIOS):
+        emitens = [e.upper() for e in _str_list(emitens, 'emitens')]
+        scenarios = _str_list(scenarios, 'scenarios')
+        # Semua emiten x skenario di-submit dulu supaya batch tiap model jalan paralel
+        pending = [self._submit_ticker(e, scenarios) for e in emitens]
+        return {'results': [self._collect(*p) for p in pending]}
+
+# --- HTTP ---
+
+# Segmen /forecast/<X> yang merupakan endpoint POST, bukan ticker
+POST_ROUTES = ('window', 'bulk')
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    service = None  # di-set oleh make_server
+    protocol_version = 'HTTP/1.1'  # keep-alive: client tidak membuka koneksi baru per request
+
+    def log_message(self, fmt, *args):
+        logger.debug(fmt, *args)
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, fn):
+        try:
+            with timer('service.request'):
+                self._send(200, fn())
+        except ServiceError as e:
+            self._send(e.status, {'error': str(e)})
+        except Exception as e:
+            logger.exception("Request gagal")
+            self._send(500, {'error': str(e)})
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise ServiceError("body bukan JSON valid")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        if parts == ['health']:
+            return self._handle(lambda: {'status': 'ok', 'batches': self.service.batcher.batches,
+                                         'requests': self.service.batcher.requests})
+        if len(parts) == 2 and parts[0] == 'forecast' and parts[1] in POST_ROUTES:
+            return self._send(405, {'error': f"gunakan POST untuk {url.path}"}, {'Allow': 'POST'})
+        if len(parts) == 2 and parts[0] == 'forecast':
+            scenarios = parse_qs(url.query).get('scenario') or SCENARIOS
+            return self._handle(lambda: self.service.forecast_ticker(parts[1].upper(), scenarios))
+        self._send(404, {'error': f"path tidak dikenal: {url.path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/forecast/window':
+            def run():
+                body = self._body()
+                return self.service.forecast_window(str(body.get('emiten', '')).upper(),
+                                                    body.get('scenario', 'fusion'), body.get('window'))
+            return self._handle(run)
+        if path == '/forecast/bulk':
+            def run():
+                body = self._body()
+                return self.service.forecast_bulk(body.get('emitens') or EMITENS, body.get('scenarios') or SCENARIOS)
+            return self._handle(run)
+        self._send(404, {'error': f"path tidak dikenal: {path}"})
+
+class ForecastServer(ThreadingHTTPServer):
+    # Backlog listen default socketserver (5) membuat koneksi direset saat puluhan client
+    # connect bersamaan; thread per koneksi tetap dibuat oleh ThreadingMixIn
+    request_queue_size = 128
+    daemon_threads = True
+
+def make_server(host='127.0.0.1', port=8502, service=None):
+    handler = type('BoundForecastHandler', (ForecastHandler,), {'service': service or ForecastService()})
+    return ForecastServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast service HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-delay-ms', type=float, default=3.0)
+    parser.add_argument('--max-concurrent', type=int, default=None, help="Batch paralel maksimum (default: jumlah core)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Jumlah proses worker ShardPool (0 = inferensi di proses ini)")
+    parser.add_argument('--warm', action='store_true', help="Load & trace semua model sebelum menerima request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pool = None
+    if args.workers:
+        from utils.shard_pool import ShardPool
+        pool = ShardPool(n_workers=args.workers, max_batch=args.max_batch)
+    service = ForecastService(max_batch=args.max_batch, max_delay_ms=args.max_delay_ms,
+                              max_concurrent=args.max_concurrent, pool=pool)
+    if args.warm: service.batcher.warm([(e, sc) for e in EMITENS for sc in SCENARIOS])
+    server = make_server(args.host, args.port, service)
+    print(f"Forecast service di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
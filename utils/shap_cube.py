@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+SHAP_COLUMNS = ['Feature', 'Feature Name', 'Category', 'Importance', 'Rank']
+GLOBAL = None  # key emiten untuk agregat seluruh emiten
+
+class ShapCube:
+    """
+    Cube importance SHAP (emiten, scenario, feature) dari shap_values_summary.csv.
+    Rata-rata global per scenario, ranking dan frame siap-plot dihitung sekali saat build;
+    halaman cukup lookup view(scenario, emiten) tanpa groupby/filter per rerun.
+    """
+    def __init__(self, emitens, scenarios, features, names, categories, values):
+        self.emitens = emitens
+        self.scenarios = scenarios
+        self.features = features
+        self.names = names
+        self.categories = categories
+        self.values = values  # (E, S, F) float64, NaN = fitur tidak dipakai scenario itu
+        self.global_values = self._nanmean(values, axis=0)  # (S, F)
+        self._views = {}
+        for s, scenario in enumerate(scenarios):
+            self._views[(GLOBAL, scenario)] = self._frame(self.global_values[s])
+            for e, emiten in enumerate(emitens):
+                self._views[(emiten, scenario)] = self._frame(values[e, s])
+
+    @staticmethod
+    def _nanmean(values, axis):
+        # Tanpa RuntimeWarning untuk fitur yang kosong di semua emiten (mis. sentimen di baseline)
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=axis)
+        sums = np.where(valid, values, 0.0).sum(axis=axis)
+        return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+    def _frame(self, importance):
+        # Urut menurun (NaN di akhir lalu dibuang); Rank 1 = paling berpengaruh
+        order = np.argsort(-importance, kind='stable')
+        order = order[~np.isnan(importance[order])]
+        return pd.DataFrame({
+            'Feature': self.features[order],
+            'Feature Name': self.names[order],
+            'Category': self.categories[order],
+            'Importance': importance[order],
+            'Rank': np.arange(1, len(order) + 1),
+        })
+
+    @classmethod
+    def from_frame(cls, df):
+        if df.empty: return cls(np.array([]), [], np.array([]), np.array([]), np.array([]), np.zeros((0, 0, 0)))
+        e_idx, emitens = pd.factorize(df['Emiten'], sort=True)
+        s_idx, scenarios = pd.factorize(df['Scenario'], sort=True)
+        f_idx, features = pd.factorize(df['Feature'])
+        # Metadata per fitur: kemunculan pertama (Feature Name & Category konstan per fitur)
+        first = np.unique(f_idx, return_index=True)[1]
+        names = df['Feature Name'].to_numpy()[first]
+        categories = df['Category'].to_numpy()[first]
+
+        # Duplikat (emiten, scenario, feature) dirata-rata lewat sum/count
+        shape = (len(emitens), len(scenarios), len(features))
+        sums, counts = np.zeros(shape), np.zeros(shape)
+        np.add.at(sums, (e_idx, s_idx, f_idx), df['Importance'].to_numpy(dtype='float64'))
+        np.add.at(counts, (e_idx, s_idx, f_idx), 1)
+        values = np.divide(sums, counts, out=np.full(shape, np.nan), where=counts > 0)
+        return cls(list(emitens), list(scenarios), np.asarray(features), names, categories, values)
+
+    def __contains__(self, key):
+        return key in self._views
+
+    def view(self, scenario, emiten=GLOBAL):
+        """
+        Frame (Feature, Feature Name, Category, Importance, Rank) terurut Rank.
+        emiten=None: rata-rata seluruh emiten. Objek dishare, jangan dimutasi in-place.
+        """
+        view = self._views.get((emiten, scenario))
+        return view if view is not None else pd.DataFrame(columns=SHAP_COLUMNS)
+
+    def top_k(self, scenario, emiten=GLOBAL, k=3):
+        return self.view(scenario, emiten).head(k)
+
@@ -0,0 +1,297 @@
+"""
+Pool proses inferensi yang di-shard per (emiten, scenario). Tiap worker memegang
+sebagian model di interpreter-nya sendiri (tanpa kontensi GIL antar emiten) dan
+menerima window lewat shared memory: yang lewat pipe hanya metadata kecil
+(slot, emiten, scenario, n), tensor window/prediksi tidak pernah di-pickle.
+
+Router (ShardPool) berjalan di proses utama: memilih worker pemilik model,
+menulis window ke slot shared memory worker itu, lalu menunggu balasan.
+"""
+import atexit
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.data_loader import EMITENS, SCENARIOS, MODEL_FEATS
+from utils.forecast import HORIZON
+
+# SHARD_WORKERS        : jumlah proses worker (default: jumlah core)
+# SHARD_WORKER_THREADS : thread intra-op TensorFlow per worker (1 = satu core per worker)
+# FORECAST_SHARD_POOL  : '1' = ForecastJob (halaman Streamlit) mengirim inferensi ke ShardPool
+#                        tunggal per proses; default '0' (inferensi di thread proses Streamlit)
+SHARD_WORKERS = int(os.environ.get('SHARD_WORKERS', 0)) or (os.cpu_count() or 1)
+SHARD_WORKER_THREADS = int(os.environ.get('SHARD_WORKER_THREADS', 1))
+# SHARD_POOL_RETRY_S   : jeda (detik) sebelum get_shard_pool() mencoba start ulang setelah gagal
+FORECAST_SHARD_POOL = os.environ.get('FORECAST_SHARD_POOL', '0') == '1'
+SHARD_POOL_RETRY_S = float(os.environ.get('SHARD_POOL_RETRY_S', 60))
+WINDOW_SIZE = 60
+
+logger = logging.getLogger(__name__)
+
+def shard_keys(keys, n_workers):
+    """
+    Bagi (emiten, scenario) round-robin ke worker. Return list keys per worker.
+    """
+    shards = [[] for _ in range(n_workers)]
+    for i, key in enumerate(sorted(keys)):
+        shards[i % n_workers].append(key)
+    return shards
+
+def _slab_shapes(slots, max_batch):
+    return (slots, max_batch, WINDOW_SIZE, len(MODEL_FEATS)), (slots, max_batch, HORIZON)
+
+# --- WORKER ---
+
+def _worker_main(keys, conn, in_name, out_name, slots, max_batch, threads):
+    """
+    Loop worker: load model shard-nya, lalu eksekusi (slot, emiten, scenario, n)
+    dengan membaca/menulis langsung ke shared memory.
+    """
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+    from utils.forecast import model_inputs
+    from utils.model_loader import get_model_registry, run_inference
+
+    in_shape, out_shape = _slab_shapes(slots, max_batch)
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    windows = np.ndarray(in_shape, dtype='float32', buffer=shm_in.buf)
+    preds = np.ndarray(out_shape, dtype='float32', buffer=shm_out.buf)
+
+    registry = get_model_registry()
+    for emiten, scenario in keys:
+        model = registry.get(emiten, scenario)
+        if model is None: continue
+        # Trace batch 1 & batch dinamis sekarang, bukan saat request pertama
+        for n in (1, 2):
+            inputs = model_inputs(np.zeros((n, WINDOW_SIZE, len(MODEL_FEATS)), dtype='float32'), scenario)
+            run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+    conn.send(('ready', None))
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None: break
+            slot, emiten, scenario, n = msg
+            try:
+                model = registry.get(emiten, scenario)
+                if model is None: raise FileNotFoundError(f"model {scenario}_{emiten} tidak ditemukan")
+                inputs = model_inputs(windows[slot, :n], scenario)
+                out = run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+                preds[slot, :n] = out
+                conn.send((slot, None))
+            except Exception as e:
+                conn.send((slot, f"{type(e).__name__}: {e}"))
+    finally:
+        del windows, preds
+        shm_in.close()
+        shm_out.close()
+
+# --- ROUTER ---
+
+class _WorkerHandle:
+    def __init__(self, ctx, keys, slots, max_batch, threads):
+        in_shape, out_shape = _slab_shapes(slots, max_batch)
+        self.keys = keys
+        self.shm_in = shared_memory.SharedMemory(create=True, size=int(np.prod(in_shape)) * 4)
+        self.shm_out = shared_memory.SharedMemory(create=True, size=int(np.prod(out_shape)) * 4)
+        self.windows = np.ndarray(in_shape, dtype='float32', buffer=self.shm_in.buf)
+        self.preds = np.ndarray(out_shape, dtype='float32', buffer=self.shm_out.buf)
+        self.free_slots = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.pending = {}  # slot -> (Future, n)
+        self.send_lock = threading.Lock()
+        self.state_lock = threading.Lock()  # pending + dead
+        self.dead = False
+
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(keys, child_conn, self.shm_in.name, self.shm_out.name, slots, max_batch, threads),
+            daemon=True
+        )
+        try:
+            self.process.start()
+        except BaseException:
+            self._release_shm()
+            raise
+        finally:
+            child_conn.close()
+
+    def wait_ready(self, timeout):
+        if not self.conn.poll(timeout): raise TimeoutError(f"worker {self.process.pid} tidak siap")
+        self.conn.recv()
+        self.receiver = threading.Thread(target=self._receive, daemon=True)
+        self.receiver.start()
+
+    @property
+    def alive(self):
+        return not self.dead and self.process.is_alive()
+
+    def _acquire_slot(self):
+        # Tidak memblok selamanya: cek ulang status worker selama menunggu slot
+        while True:
+            if not self.alive: raise RuntimeError(f"worker shard {self.process.pid} berhenti")
+            try:
+                return self.free_slots.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    def submit(self, emiten, scenario, batch):
+        slot = self._acquire_slot()
+        n = len(batch)
+        self.windows[slot, :n] = batch
+        future = Future()
+        with self.state_lock:
+            if self.dead:
+                self.free_slots.put(slot)
+                raise RuntimeError(f"worker shard {self.process.pid} berhenti")
+            self.pending[slot] = (future, n)
+        try:
+            with self.send_lock:
+                self.conn.send((slot, emiten, scenario, n))
+        except OSError as e:
+            self._fail_pending(e)
+            raise RuntimeError(f"worker shard {self.process.pid} berhenti") from e
+        return future
+
+    def _fail_pending(self, cause=None):
+        # Worker mati: gagalkan request yang menunggu dan kembalikan slotnya ke antrean
+        with self.state_lock:
+            self.dead = True
+            pending, self.pending = self.pending, {}
+        for slot, (future, _) in pending.items():
+            self.free_slots.put(slot)
+            if not future.done(): future.set_exception(RuntimeError(f"worker shard berhenti ({cause})"))
+
+    def _receive(self):
+        while True:
+            try:
+                slot, error = self.conn.recv()
+            except (EOFError, OSError) as e:
+                self._fail_pending(type(e).__name__)
+                return
+            with self.state_lock:
+                entry = self.pending.pop(slot, None)
+            # Slot sudah dibersihkan _fail_pending (submit gagal kirim): balasan diabaikan
+            if entry is None: continue
+            future, n = entry
+            result = None if error else self.preds[slot, :n].copy()
+            self.free_slots.put(slot)
+            if error: future.set_exception(RuntimeError(error))
+            else: future.set_result(result)
+
+    def close(self, timeout=10):
+        self.dead = True
+        try:
+            with self.send_lock:
+                self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+        self._release_shm()
+
+    def _release_shm(self):
+        self.windows = self.preds = None
+        for shm in (self.shm_in, self.shm_out):
+            shm.close()
+            shm.unlink()
+
+class ShardPool:
+    """
+    Router ke worker pemilik model. predict() menerima window ter-scale (n, 60, 11)
+    dan return Future berisi prediksi ter-scale (n, 3); batch > max_batch dipecah.
+    """
+    def __init__(self, n_workers=SHARD_WORKERS, keys=None, slots=8, max_batch=64,
+                 threads=SHARD_WORKER_THREADS, start_timeout=300):
+        keys = keys or [(e, sc) for e in EMITENS for sc in SCENARIOS]
+        n_workers = max(1, min(n_workers, len(keys)))
+        self.max_batch = max_batch
+        # spawn: worker tidak mewarisi state TensorFlow/thread dari proses induk
+        ctx = mp.get_context('spawn')
+        self.workers = []
+        self._closed = False
+        try:
+            for shard in shard_keys(keys, n_workers):
+                self.workers.append(_WorkerHandle(ctx, shard, slots, max_batch, threads))
+            for w in self.workers:
+                w.wait_ready(start_timeout)
+        except BaseException:
+            # Worker & segmen shared memory yang sudah dibuat jangan sampai bocor;
+            # worker yang masih load model langsung di-terminate
+            self.close(timeout=0)
+            raise
+        self.route = {key: w for w in self.workers for key in w.keys}
+        atexit.register(self.close)
+
+    def __contains__(self, key):
+        return key in self.route
+
+    @property
+    def alive(self):
+        return not self._closed and all(w.alive for w in self.workers)
+
+    def predict(self, emiten, scenario, scaled):
+        worker = self.route.get((emiten, scenario))
+        if worker is None: raise KeyError(f"tidak ada shard untuk {scenario}_{emiten}")
+        scaled = np.asarray(scaled, dtype='float32')
+        if len(scaled) <= self.max_batch:
+            return worker.submit(emiten, scenario, scaled)
+
+        parts = [worker.submit(emiten, scenario, scaled[i:i + self.max_batch])
+                 for i in range(0, len(scaled), self.max_batch)]
+        combined, lock = Future(), threading.Lock()
+        def gather(_):
+            with lock:
+                if combined.done() or not all(p.done() for p in parts): return
+                errors = [p.exception() for p in parts if p.exception() is not None]
+                if errors: combined.set_exception(errors[0])
+                else: combined.set_result(np.concatenate([p.result() for p in parts]))
+        for p in parts:
+            p.add_done_callback(gather)
+        return combined
+
+    def close(self, timeout=10):
+        if self._closed: return
+        self._closed = True
+        for w in self.workers:
+            w.close(timeout)
+
+_pool = None
+_pool_failed_at = None
+_pool_lock = threading.Lock()
+
+def get_shard_pool():
+    """
+    ShardPool tunggal per proses untuk mode FORECAST_SHARD_POOL (dishare semua sesi).
+    Return None jika worker gagal start; pemanggil kembali ke inferensi lokal dan start
+    dicoba lagi setelah SHARD_POOL_RETRY_S. Pool yang worker-nya mati dibangun ulang.
+    """
+    global _pool, _pool_failed_at
+    with _pool_lock:
+        if _pool is not None and not _pool.alive:
+            logger.warning("Worker ShardPool berhenti, pool dibangun ulang")
+            _pool.close()
+            _pool = None
+        if _pool is not None: return _pool
+        if _pool_failed_at is not None and time.monotonic() - _pool_failed_at < SHARD_POOL_RETRY_S:
+            return None
+        try:
+            _pool = ShardPool()
+            _pool_failed_at = None
+        except Exception:
+            logger.exception("ShardPool gagal start, inferensi tetap di proses ini")
+            _pool_failed_at = time.monotonic()
+        return _pool
@@ -0,0 +1,32 @@
+"""
+Adapter tipis Streamlit di atas data layer murni (utils.data_loader).
+Caching sudah ditangani data layer (shared per proses, tanpa pickling per panggilan);
+adapter hanya menampilkan masalah data ke UI. Halaman import dari sini, modul engine
+(forecast, backtest, worker) import langsung dari utils.data_loader.
+"""
+import streamlit as st
+
+from utils import data_loader
+from utils.data_loader import (
+    load_shap_data,
+    load_shap_cube,
+    load_evaluation_files,
+    prepare_input_data,
+    EMITENS,
+    MODEL_FEATS,
+    SCENARIOS
+)
+
+def load_dataset():
+    df = data_loader.load_dataset()
+    if df.empty:
+        st.error(f"❌ File Numerik hilang: {data_loader.DATASET_SOURCES[0]}")
+    return df
+
+def load_dataset_index():
+    # Halaman membaca dari index (di-update in place oleh ingest), bukan frame load_dataset()
+    # yang dibangun ulang penuh dari CSV setelah append_trading_days(persist=True)
+    index = data_loader.load_dataset_index()
+    if not index.tickers():
+        st.error(f"❌ File Numerik hilang: {data_loader.DATASET_SOURCES[0]}")
+    return index
@@ -0,0 +1,121 @@
+"""
+Interval prediksi H+1..H+3 (quantile band) untuk fan chart. Semua sampel dievaluasi
+sebagai SATU batch tensor (default 512), bukan predict berulang:
+  'mc_dropout' : layer Dropout tetap aktif (training=True), input sama di-broadcast N kali
+  'bootstrap'  : N window hasil block-bootstrap dari perubahan harian window 60 hari,
+                 dijangkar ke baris terakhir; lewat backend inferensi aktif
+"""
+import os
+import threading
+import weakref
+
+import numpy as np
+
+from utils.cache import LRUCache
+from utils.data_loader import load_dataset_index
+from utils.forecast import scale_windows, model_inputs
+from utils.forecast_cache import forecast_key
+from utils.model_loader import get_model_registry, run_inference, serving_signature
+from utils.metrics import metrics, timer, timed
+
+# UNCERTAINTY_METHOD : 'mc_dropout' (default; fallback ke bootstrap jika model tanpa Dropout) atau 'bootstrap'
+# UNCERTAINTY_SAMPLES: jumlah sampel per band (satu batch inferensi)
+UNCERTAINTY_METHOD = os.environ.get('UNCERTAINTY_METHOD', 'mc_dropout')
+UNCERTAINTY_SAMPLES = int(os.environ.get('UNCERTAINTY_SAMPLES', 512))
+# Quantile band: 90% (0.05-0.95) dan 50% (0.25-0.75) + median
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+BOOTSTRAP_BLOCK = 5
+
+_bands = LRUCache(maxsize=64)
+
+# --- SAMPLERS ---
+
+_mc_fns = weakref.WeakKeyDictionary()  # model -> tf.function(training=True), batch dinamis
+_mc_lock = threading.Lock()
+
+def has_dropout(model):
+    return any(layer.__class__.__name__ == 'Dropout' for layer in model.layers)
+
+def _mc_function(model):
+    import tensorflow as tf
+    with _mc_lock:
+        fn = _mc_fns.get(model)
+        if fn is None:
+            n_inputs = len(model.inputs)
+            def call(*x):
+                return model(list(x) if n_inputs > 1 else x[0], training=True)
+            fn = tf.function(call, input_signature=serving_signature(model, None))
+            _mc_fns[model] = fn
+        return fn
+
+def mc_dropout_samples(model, scaled, scenario, n_samples):
+    """
+    scaled (T, 11) -> prediksi ter-scale (N, H); mask dropout berbeda per baris batch.
+    """
+    batch = np.broadcast_to(scaled, (n_samples,) + scaled.shape)
+    xs = [np.ascontiguousarray(x, dtype='float32') for x in model_inputs(batch, scenario)]
+    with timer('inference.mc_dropout'):
+        return _mc_function(model)(*xs).numpy()
+
+def block_bootstrap_windows(window, n_samples, block=BOOTSTRAP_BLOCK, seed=0):
+    """
+    N window sintetis (N, T, F): perubahan harian window di-resample per blok
+    (menjaga autokorelasi jangka pendek), lalu dijumlah mundur dari baris terakhir
+    sehingga kondisi terkini identik dan hanya jalur historisnya yang berbeda.
+    """
+    rng = np.random.default_rng(seed)
+    diffs = np.diff(window, axis=0)  # (T-1, F)
+    n_diffs = len(diffs)
+    n_blocks = -(-n_diffs // block)
+    starts = rng.integers(0, n_diffs - block + 1, size=(n_samples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_samples, -1)[:, :n_diffs]
+    sampled = diffs[idx]  # (N, T-1, F)
+    # x_t = x_T - sum_{s>t} d_s
+    tail_sums = np.cumsum(sampled[:, ::-1], axis=1)[:, ::-1]
+    paths = window[-1] - tail_sums
+    return np.concatenate([paths, np.broadcast_to(window[-1], (n_samples, 1, window.shape[1]))], axis=1)
+
+def bootstrap_samples(model, scaled, scenario, n_samples, emiten=None):
+    batch = block_bootstrap_windows(scaled, n_samples).astype('float32')
+    inputs = model_inputs(batch, scenario)
+    return run_inference(model, inputs if len(inputs) > 1 else inputs[0], emiten, scenario)
+
+# --- ENGINE ---
+
+@timed('uncertainty.bands')
+def forecast_bands(emiten, scenario, n_samples=UNCERTAINTY_SAMPLES, quantiles=QUANTILES,
+                   method=UNCERTAINTY_METHOD, window_size=60, index=None):
+    """
+    Quantile harga (Rupiah) untuk window terakhir emiten.
+    Return dict {'quantiles': (Q,), 'prices': (Q, H), 'method', 'n_samples'} atau None
+    jika data/model tidak tersedia. Di-cache per (emiten, scenario, tanggal, data, model).
+    """
+    index = index if index is not None else load_dataset_index()
+    key = forecast_key(emiten, scenario, window_size, index)
+    if key is None: return None
+    cache_key = tuple(key.values()) + (n_samples, tuple(quantiles), method)
+    cached, found = _bands.get(cache_key)
+    metrics.hit('uncertainty', found)
+    if found: return cached
+
+    registry = get_model_registry()
+    model, denorm = registry.get(emiten, scenario), registry.scalers.denormalizer(emiten)
+    if model is None or emiten not in denorm: return None
+    raw = index.get_window(emiten, n=window_size)
+    scaled = scale_windows(raw[None], denorm, [emiten])[0]
+
+    if method == 'mc_dropout' and not has_dropout(model): method = 'bootstrap'
+    if method == 'mc_dropout':
+        preds = mc_dropout_samples(model, scaled, scenario, n_samples)
+    else:
+        preds = bootstrap_samples(model, scaled, scenario, n_samples, emiten)
+
+    prices = denorm.inverse_price(np.asarray(preds, dtype='float64'), emiten)  # (N, H)
+    result = {
+        'quantiles': np.asarray(quantiles),
+        'prices': np.quantile(prices, quantiles, axis=0),
+        'method': method,
+        'n_samples': n_samples,
+    }
+    _bands.put(cache_key, result)
+    return result